@@ -1,7 +1,19 @@
 import tkinter as tk
 import numpy as np
-import random
-from random import randint
+
+
+def csr_adjacency(num_vertices, edges):
+    """CSR neighbor lists (indptr, indices) of an undirected graph given as a (2, m) edge array.
+
+    The neighbors of vertex v are indices[indptr[v]:indptr[v + 1]], in ascending order.
+    """
+    heads = np.concatenate((edges[0], edges[1]))
+    tails = np.concatenate((edges[1], edges[0]))
+    order = np.lexsort((tails, heads))
+    indptr = np.zeros(num_vertices + 1, dtype=np.int32)
+    np.cumsum(np.bincount(heads, minlength=num_vertices), out=indptr[1:])
+    return indptr, tails[order].astype(np.int32)
+
 
 class GraphColoringApp:
     def __init__(self, root):
@@ -40,7 +52,9 @@ class GraphColoringApp:
         # Parameters for genetic algorithm
         self.population_size = 60
         self.max_num_colors = None
-        self.graph = None
+        self.edges = None  # (2, m) int32 endpoints, each edge once with the smaller vertex first
+        self.indptr = None  # CSR adjacency: neighbors of v are indices[indptr[v]:indptr[v + 1]]
+        self.indices = None
 
         # Extended color palette for vertices
         self.colors = [
@@ -52,14 +66,16 @@ class GraphColoringApp:
         ]
 
     def create_graph(self):
-        """Generate circular adjacency matrix based on user input and start algorithm."""
+        """Generate a circular graph based on user input and start algorithm."""
         self.n = int(self.vertex_entry.get())  # Number of vertices
-        self.graph = np.zeros((self.n, self.n), dtype=int)
 
-        # Set adjacency in a circular manner
-        for i in range(self.n):
-            self.graph[i][(i + 1) % self.n] = 1  # Connect to next vertex
-            self.graph[(i + 1) % self.n][i] = 1  # Connect back to previous vertex
+        # Connect every vertex to the next one in a circular manner
+        vertices = np.arange(self.n, dtype=np.int32)
+        following = (vertices + 1) % self.n
+        edges = np.sort(np.stack((vertices, following)), axis=0)
+        edges = edges[:, edges[0] != edges[1]]  # A single vertex has no edge to itself
+        self.edges = np.unique(edges, axis=1)  # Two vertices share one edge
+        self.indptr, self.indices = csr_adjacency(self.n, self.edges)
 
         self.max_num_colors = self.get_max_colors()
         self.population = self.create_population()
@@ -80,34 +96,96 @@ class GraphColoringApp:
         return np.random.randint(1, self.max_num_colors + 1, size=(self.n))
 
     def create_population(self):
-        """Create a population of chromosomes."""
-        return np.array([self.create_chromosome() for _ in range(self.population_size)])
+        """Create a population of chromosomes and the buffers every generation is computed in."""
+        population = np.array([self.create_chromosome() for _ in range(self.population_size)], dtype=np.int32)
+        m = self.edges.shape[1]
+        self.parents = np.empty_like(population)  # Parents picked by selection
+        self.next_population = np.empty_like(population)  # Children, swapped with the population
+        self.fitness = np.empty(self.population_size, dtype=np.int64)
+        self.endpoint_colors = np.empty((2, self.population_size, m), dtype=np.int32)
+        self.conflicts = np.empty((self.population_size, m), dtype=bool)
+        self.vertex_conflicts = np.empty((self.population_size, self.n), dtype=np.int32)  # Conflicting neighbors
+        self.segment = np.empty((self.population_size // 2, self.n), dtype=bool)
+        self.segment_end = np.empty_like(self.segment)
+        return population
 
     def calc_fitness(self, chromosome):
         """Calculate fitness based on penalty for adjacent vertices sharing the same color."""
-        penalty = 0
-        for vertex1 in range(self.n):
-            for vertex2 in range(vertex1 + 1, self.n):
-                if self.graph[vertex1][vertex2] == 1 and chromosome[vertex1] == chromosome[vertex2]:
-                    penalty += 1
+        penalty = np.count_nonzero(chromosome[self.edges[0]] == chromosome[self.edges[1]])
         # Higher fitness score is better, so we return negative of penalty
         return -penalty
 
-    def targeted_mutation(self, chromosome, chance):
-        """Enhanced mutation to resolve conflicts in coloring adjacent vertices."""
-        if random.uniform(0, 1) <= chance:
-            for vertex1 in range(self.n):
-                for vertex2 in range(self.n):
-                    if self.graph[vertex1][vertex2] == 1 and chromosome[vertex1] == chromosome[vertex2]:
-                        # Change the color of one of the conflicting vertices
-                        chromosome[vertex1] = random.choice(
-                            [color for color in range(1, self.max_num_colors + 1) if color != chromosome[vertex2]]
-                        )
-        return chromosome
+    def find_conflicts(self, population):
+        """Mark in self.conflicts, for every chromosome and edge, whether both endpoints share a color."""
+        np.take(population, self.edges[0], axis=1, out=self.endpoint_colors[0])
+        np.take(population, self.edges[1], axis=1, out=self.endpoint_colors[1])
+        np.equal(self.endpoint_colors[0], self.endpoint_colors[1], out=self.conflicts)
+        return self.conflicts
+
+    def count_vertex_conflicts(self, population):
+        """Count, for every chromosome and vertex, the neighbors sharing its color into self.vertex_conflicts."""
+        # Only the conflicting edges are listed, so the index arrays stay as small as the conflict count
+        rows, edges = np.nonzero(self.find_conflicts(population))
+        self.vertex_conflicts[...] = 0
+        np.add.at(self.vertex_conflicts, (rows, self.edges[0, edges]), 1)
+        np.add.at(self.vertex_conflicts, (rows, self.edges[1, edges]), 1)
+
+    def calc_population_fitness(self):
+        """Fitness of every chromosome of the population into self.fitness, computed once per generation
+        from the tracked conflict counts, where every conflicting edge is counted at both endpoints."""
+        np.negative(self.vertex_conflicts.sum(axis=1) // 2, out=self.fitness)
+
+    def recolor_vertex(self, chromosome, conflicts, vertex):
+        """Give vertex its least conflicting color, updating the conflict counts in O(degree).
+
+        Any color no neighbor has is picked at random; only if every color is taken is one of the rarest
+        among the neighbors chosen.
+        """
+        neighbors = self.indices[self.indptr[vertex]:self.indptr[vertex + 1]].tolist()
+        neighbor_colors = chromosome[neighbors].tolist()
+        color_counts = {}
+        for color in neighbor_colors:
+            color_counts[color] = color_counts.get(color, 0) + 1
+
+        if len(color_counts) < self.max_num_colors:
+            color = int(np.random.randint(1, self.max_num_colors + 1))
+            while color in color_counts:
+                color = int(np.random.randint(1, self.max_num_colors + 1))
+        else:
+            fewest = min(color_counts.values())
+            rarest = [color for color, count in color_counts.items() if count == fewest]
+            color = rarest[np.random.randint(len(rarest))]
+
+        old_color = int(chromosome[vertex])
+        if color == old_color:
+            return
+        for neighbor, neighbor_color in zip(neighbors, neighbor_colors):
+            if neighbor_color == old_color:
+                conflicts[neighbor] -= 1
+            elif neighbor_color == color:
+                conflicts[neighbor] += 1
+        conflicts[vertex] = color_counts.get(color, 0)
+        chromosome[vertex] = color
+
+    def targeted_mutation(self, chromosomes, chance):
+        """Enhanced mutation to resolve conflicts in coloring adjacent vertices.
+
+        Each chromosome is mutated with probability chance: its conflicting vertices, found from
+        self.vertex_conflicts, are recolored in random order, skipping any whose conflicts a recolored
+        neighbor already resolved. The work scales with the number of conflicts, not with n.
+        """
+        mutated = np.flatnonzero(np.random.uniform(0, 1, size=len(chromosomes)) <= chance)
+        for row in mutated.tolist():
+            chromosome, conflicts = chromosomes[row], self.vertex_conflicts[row]
+            pending = np.flatnonzero(conflicts)
+            np.random.shuffle(pending)
+            for vertex in pending.tolist():
+                if conflicts[vertex]:
+                    self.recolor_vertex(chromosome, conflicts, vertex)
 
     def roulette_wheel_selection(self):
         """Roulette wheel selection to choose parents for crossover."""
-        fitness_values = np.array([self.calc_fitness(p) for p in self.population])
+        fitness_values = self.fitness
 
         # Invert fitness scores to get selection probabilities (lower fitness = higher probability)
         max_fitness = fitness_values.max() + 1
@@ -116,40 +194,51 @@ class GraphColoringApp:
         # Ensure population is 1-dimensional for np.random.choice
         selected_indices = np.random.choice(len(self.population), size=self.population_size, replace=True,
                                             p=probabilities)
-        parents = self.population[selected_indices]
-
-        return parents
-
-    def two_point_crossover(self, parent1, parent2):
-        """Two-point crossover between two parents."""
-        split_point1 = randint(1, self.n - 2)
-        split_point2 = randint(split_point1 + 1, self.n - 1)
-        child1 = np.concatenate((parent1[:split_point1], parent2[split_point1:split_point2], parent1[split_point2:]))
-        child2 = np.concatenate((parent2[:split_point1], parent1[split_point1:split_point2], parent2[split_point2:]))
-        return child1, child2
+        np.take(self.population, selected_indices, axis=0, out=self.parents)
+
+        return self.parents
+
+    def two_point_crossover(self, parents, children):
+        """Two-point crossover between consecutive pairs of parents, written into children.
+
+        Each pair swaps the genes between its own two random split points; with an odd population the
+        last parent is copied unchanged.
+        """
+        pairs = len(self.segment)
+        split_point1 = np.random.randint(1, self.n - 1, size=(pairs, 1))
+        split_point2 = np.random.randint(split_point1 + 1, self.n)
+        vertices = np.arange(self.n)
+        np.greater_equal(vertices, split_point1, out=self.segment)
+        np.less(vertices, split_point2, out=self.segment_end)
+        self.segment &= self.segment_end
+
+        first, second = parents[0:2 * pairs:2], parents[1:2 * pairs:2]
+        np.copyto(children[0:2 * pairs:2], first)
+        np.copyto(children[0:2 * pairs:2], second, where=self.segment)
+        np.copyto(children[1:2 * pairs:2], second)
+        np.copyto(children[1:2 * pairs:2], first, where=self.segment)
+        children[2 * pairs:] = parents[2 * pairs:]
 
     def solve_with_genetic_algorithm(self):
         """Run the genetic algorithm to solve the graph coloring problem."""
         generations = 1000
         best_fitness = float('inf')
         fittest = None
+        self.count_vertex_conflicts(self.population)
+        self.calc_population_fitness()
 
         for generation in range(generations):
             self.generation_label.config(text=f"Generation: {generation}")
             self.root.update_idletasks()  # Update the display
 
-            # Selection, Crossover, Mutation, and Population Update as before
-            population = self.roulette_wheel_selection()
-            children_population = []
-
-            for i in range(0, len(population) - 1, 2):
-                child1, child2 = self.two_point_crossover(population[i], population[i + 1])
-                child1 = self.targeted_mutation(child1, 0.65 if generation < 100 else 0.15)
-                child2 = self.targeted_mutation(child2, 0.65 if generation < 100 else 0.15)
-                children_population.append(child1)
-                children_population.append(child2)
+            # Selection, Crossover and Mutation of the whole population at once, into the spare buffer
+            parents = self.roulette_wheel_selection()
+            self.two_point_crossover(parents, self.next_population)
+            self.count_vertex_conflicts(self.next_population)
+            self.targeted_mutation(self.next_population, 0.65 if generation < 100 else 0.15)
 
-            self.population = np.array(children_population)
+            self.population, self.next_population = self.next_population, self.population
+            self.calc_population_fitness()
             best_fitness, fittest = self.get_best_fitness()
 
             if best_fitness == 0:
@@ -172,8 +261,7 @@ class GraphColoringApp:
         positions = self.generate_vertices_positions()
 
         # Draw edges (connections between adjacent vertices)
-        for i in range(self.n):
-            next_vertex = (i + 1) % self.n  # Circular adjacency
+        for i, next_vertex in self.edges.T.tolist():
             x1, y1 = positions[i]
             x2, y2 = positions[next_vertex]
 
@@ -212,23 +300,13 @@ class GraphColoringApp:
 
     def get_best_fitness(self):
         """Get the best fitness from the current population."""
-        best_fitness = float('inf')
-        fittest = None
-        for individual in self.population:
-            fitness = self.calc_fitness(individual)
-            if fitness < best_fitness:
-                best_fitness = fitness
-                fittest = individual
-        return best_fitness, fittest
+        best = int(np.argmin(self.fitness))
+        return int(self.fitness[best]), self.population[best].copy()
 
     # New method outside of the loop
     def check_solution_validity(self, solution):
         """Validate solution to ensure no adjacent vertices share the same color."""
-        for vertex1 in range(self.n):
-            for vertex2 in range(vertex1 + 1, self.n):
-                if self.graph[vertex1][vertex2] == 1 and solution[vertex1] == solution[vertex2]:
-                    return False
-        return True
+        return not np.any(solution[self.edges[0]] == solution[self.edges[1]])
     def restart(self):
         """Reset everything to start from scratch."""
         self.solve_button.config(state=tk.NORMAL)  # Enable solve button
@@ -0,0 +1,155 @@
+import numpy as np
+
+import KnapsackGA
+
+
+def batch_sums(population, values):
+    """Value sums of every genome of every instance: (instances, pop, items) bits times (instances, items)."""
+    sums = np.empty(population.shape[:2], dtype=np.int64)
+    step = max(1, KnapsackGA.chunk_genes // max(population.shape[1] * population.shape[2], 1))
+    weights = values[:, :, None].astype(np.float64)  # Batched BLAS products, as in KnapsackGA.population_sums
+    for start in range(0, len(population), step):
+        chunk = population[start:start + step].astype(np.float64)
+        sums[start:start + step] = np.rint(chunk @ weights[start:start + step])[..., 0]
+    return sums
+
+
+def repair(genomes, values, targets, group, rng):
+    """Drop, then add, items in a random order per genome until each genome is within its target and no
+    item left out would still fit; genomes (rows, items) are updated in place.
+
+    Row r belongs to instance r // group, whose item values and target are values[r // group] and
+    targets[r // group]. Each genome walks a shared random permutation of the items from its own random
+    starting point, as in GeneticKnapsack.repair. Batches hold many short genomes, so the walk is swept
+    one step at a time with every step a vectorized pass across the rows.
+    """
+    num_items = genomes.shape[1]
+    if num_items == 0:
+        return
+    permutation = rng.permutation(num_items)
+    smallest = np.where(values > 0, values, np.iinfo(np.int64).max).min(axis=1)
+    step_rows = max(1, KnapsackGA.chunk_genes // num_items)
+    for start in range(0, len(genomes), step_rows):
+        chunk = genomes[start:start + step_rows]
+        owner = (start + np.arange(len(chunk))) // group
+        starts = rng.integers(0, num_items, size=(len(chunk), 1))
+        walk = permutation[(starts + np.arange(num_items)) % num_items]
+        rows = np.arange(len(chunk))[:, None]
+        # Step-major copies, so every step of the walk reads one contiguous row
+        genes = np.ascontiguousarray(chunk[rows, walk].T)
+        item_values = np.ascontiguousarray(values[owner[:, None], walk].T)
+        sums = np.where(genes, item_values, 0).sum(axis=0)
+        target = targets[owner]
+
+        # Drop the earliest included items until the rest fits
+        for step in range(num_items):
+            over = sums > target
+            if not over.any():
+                break
+            dropped = genes[step] & over
+            genes[step] ^= dropped
+            sums -= np.where(dropped, item_values[step], 0)
+
+        # Add items that still fit, first-fit in walk order
+        for step in range(num_items):
+            slack = target - sums
+            if not (slack >= smallest[owner]).any():
+                break
+            added = ~genes[step] & (item_values[step] <= slack)
+            genes[step] |= added
+            sums += np.where(added, item_values[step], 0)
+
+        chunk[rows, walk] = genes.T
+
+
+class BatchGeneticKnapsack:
+    """Many knapsack instances evolved together as one (instances, pop_size, items) boolean tensor, using
+    the GA parameters of KnapsackGA.
+
+    Instances of different sizes are padded with zero-valued items. Each instance retires as soon as
+    its best genome hits its target; only the remaining ones are evolved further.
+    """
+
+    def __init__(self, values, targets, rng=None):
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.num_instances = len(values)
+        self.sizes = np.array([len(v) for v in values])
+        self.values = np.zeros((self.num_instances, self.sizes.max(initial=0)), dtype=np.int64)
+        for i, v in enumerate(values):
+            self.values[i, :len(v)] = v
+        self.targets = np.asarray(targets, dtype=np.int64)
+
+        self.best_genomes = np.zeros(self.values.shape, dtype=bool)
+        self.best_sums = np.zeros(self.num_instances, dtype=np.int64)
+        self.generations = np.full(self.num_instances, -1)  # Generation each instance hit its target, -1 if not
+
+        self.active = np.arange(self.num_instances)
+        shape = (self.num_instances, KnapsackGA.pop_size, self.values.shape[1])
+        self.population = self.rng.random(shape) < KnapsackGA.frac_target
+        seeded = int(KnapsackGA.pop_size * KnapsackGA.greedy_seed_fraction)
+        if seeded:
+            seeds = np.zeros((self.num_instances * seeded, self.values.shape[1]), dtype=bool)
+            repair(seeds, self.values, self.targets, seeded, self.rng)
+            self.population[:, :seeded] = seeds.reshape(self.num_instances, seeded, -1)
+        self.generation = 0
+        self.evaluate()
+
+    def evaluate(self):
+        values = self.values[self.active]
+        targets = self.targets[self.active, None]
+        self.sums = batch_sums(self.population, values)
+        self.fitness = np.where(self.sums > targets, 0, self.sums / targets)
+
+        best = np.argmax(self.fitness, axis=1)
+        rows = np.arange(len(self.active))
+        self.best_genomes[self.active] = self.population[rows, best]
+        self.best_sums[self.active] = self.sums[rows, best]
+
+        hit = self.fitness[rows, best] >= 1
+        if hit.any():
+            self.generations[self.active[hit]] = self.generation
+            keep = ~hit
+            self.active = self.active[keep]
+            self.population, self.sums, self.fitness = self.population[keep], self.sums[keep], self.fitness[keep]
+
+    def select_parents(self, count):
+        """(active, count) winners of tournaments of tournament_size random genomes within each instance."""
+        entrants = self.rng.integers(KnapsackGA.pop_size, size=(len(self.active), count, KnapsackGA.tournament_size))
+        rows = np.arange(len(self.active))[:, None, None]
+        winners = np.argmax(self.fitness[rows, entrants], axis=2)
+        return np.take_along_axis(entrants, winners[..., None], axis=2)[..., 0]
+
+    def next_generation(self):
+        elitism_count = KnapsackGA.elitism_count
+        num_children = KnapsackGA.pop_size - elitism_count
+        rows = np.arange(len(self.active))[:, None]
+        elites = np.argpartition(-self.fitness, elitism_count - 1, axis=1)[:, :elitism_count]
+        parents1, parents2 = self.select_parents(num_children), self.select_parents(num_children)
+
+        # Cuts stay within each instance's own items, not the padding
+        cuts = self.rng.integers(0, np.maximum(self.sizes[self.active], 1)[:, None], size=parents1.shape)
+        from_first = np.arange(self.values.shape[1]) < cuts[..., None]
+        children = np.where(from_first, self.population[rows, parents1], self.population[rows, parents2])
+
+        # Same mutation as GeneticKnapsack.mutate; no block sums to carry here
+        flat = children.reshape(-1)
+        flips = self.rng.integers(0, flat.size, size=self.rng.binomial(flat.size, KnapsackGA.mutation_rate))
+        flat[flips] ^= True
+        if KnapsackGA.repair_children:
+            repair(children.reshape(-1, children.shape[2]), self.values[self.active], self.targets[self.active],
+                   num_children, self.rng)
+
+        self.population = np.concatenate((self.population[rows, elites], children), axis=1)
+        self.generation += 1
+        self.evaluate()
+
+    def run(self):
+        """Evolve until every instance hits its target or num_generations pass.
+
+        Returns the best genome, best sum and hitting generation (-1 if never) of every instance;
+        genomes are padded to the largest instance with False.
+        """
+        while len(self.active) and self.generation < KnapsackGA.num_generations:
+            self.next_generation()
+        genomes = self.best_genomes & (np.arange(self.values.shape[1]) < self.sizes[:, None])
+        return genomes, self.best_sums, self.generations
@@ -1,10 +1,14 @@
-import math
-import random
 import tkinter as tk
 from tkinter import *
+import bisect
+import math
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
+from KnapsackItems import generate_items
+
 # Constants
 num_items = 100
 frac_target = 0.75
@@ -12,53 +16,376 @@ min_value = 100
 max_value = 2500
 
 screen_padding = 25
-item_padding = 5
-stroke_width = 5
 
 sleep_time = 0.05
-
-
-def random_rgb_color():
-    red = random.randint(0x10, 0xff)
-    green = random.randint(0x10, 0xff)
-    blue = random.randint(0x10, 0xff)
-    hex_color = '#{:02x}{:02x}{:02x}'.format(red, green, blue)
-    return hex_color
-
-
-class Item:
-    def __init__(self):
-        self.value = random.randint(min_value, max_value)
-        self.color = random_rgb_color()
-        self.x = 0
-        self.y = 0
-        self.w = 0
-        self.h = 0
-
-    def place(self, x, y, w, h):
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
-
-    def draw(self, canvas, active=False):
-        canvas.create_text(self.x + self.w + item_padding + stroke_width * 2, self.y + self.h / 2, text=f'{self.value}')
-        if active:
-            canvas.create_rectangle(self.x,
-                                    self.y,
-                                    self.x + self.w,
-                                    self.y + self.h,
-                                    fill=self.color,
-                                    outline=self.color,
-                                    width=stroke_width)
-        else:
-            canvas.create_rectangle(self.x,
-                                    self.y,
-                                    self.x + self.w,
-                                    self.y + self.h,
-                                    fill='',
-                                    outline=self.color,
-                                    width=stroke_width)
+table_cells = 1 << 22  # Subproblems up to this many item x capacity cells are backtracked from a full table
+dp_workers = 1  # Threads sharing each item's DP update over blocks of the capacity axis
+parallel_block_sums = 1 << 18  # Smallest capacity block handed to a DP worker
+solver = 'auto'  # 'dp', 'bitset', 'branch-and-bound', or 'auto' to choose from the instance size
+bitset_block_items = None  # Items between bitset snapshots; None picks about sqrt(n)
+core_items = 64  # Initial branch-and-bound core size around the break item, doubled until proven optimal
+core_node_limit = 1_000_000  # Branch-and-bound nodes per core before it is widened or the search gives up
+auto_bitset_words = 1 << 31  # 'auto' uses the bitset while items x capacity / 64 stays below this
+instance_sums = 1 << 26  # Repeat targets up to this are answered from the cached SolvedInstance of the items
+
+
+def sum_dtype(capacity):
+    return np.int32 if capacity < 2 ** 31 else np.int64
+
+
+def best_sums(values, capacity):
+    """best[w] is the largest subset sum of values not exceeding w, for every w up to capacity.
+
+    One rolling array, updated per item with a shifted np.maximum.
+    """
+    blocks = min(dp_workers, (capacity + 1) // parallel_block_sums)
+    if blocks > 1:
+        return parallel_best_sums(values, capacity, blocks)
+    best = np.zeros(capacity + 1, dtype=sum_dtype(capacity))
+    for value in values.tolist():
+        if value <= capacity:
+            shifted = best[:capacity + 1 - value] + value
+            np.maximum(best[value:], shifted, out=best[value:])
+    return best
+
+
+def parallel_best_sums(values, capacity, blocks):
+    """best_sums with each item's update split into capacity blocks run on a thread pool.
+
+    The new row is written to a second buffer, so every block reads only the previous row and the
+    blocks of one item run concurrently; NumPy releases the GIL inside the kernels. Items are applied
+    one after another, giving exactly the serial result.
+    """
+    best = np.zeros(capacity + 1, dtype=sum_dtype(capacity))
+    spare = np.empty_like(best)
+    bounds = np.linspace(0, capacity + 1, blocks + 1).astype(np.int64).tolist()
+
+    def update(lo, hi, value):
+        split = min(max(lo, value), hi)  # Sums below value keep their best
+        spare[lo:split] = best[lo:split]
+        if split < hi:
+            np.add(best[split - value:hi - value], value, out=spare[split:hi])
+            np.maximum(spare[split:hi], best[split:hi], out=spare[split:hi])
+
+    with ThreadPoolExecutor(blocks) as pool:
+        for value in values.tolist():
+            if value <= capacity:
+                list(pool.map(update, bounds[:-1], bounds[1:], [value] * blocks))
+                best, spare = spare, best
+    return best
+
+
+def table_solution(values, capacity):
+    """Items of a largest subset sum not exceeding capacity, backtracked from a full table of take decisions."""
+    best = np.zeros(capacity + 1, dtype=sum_dtype(capacity))
+    take = np.zeros((len(values), capacity + 1), dtype=bool)
+    for i, value in enumerate(values.tolist()):
+        if value <= capacity:
+            shifted = best[:capacity + 1 - value] + value
+            take[i, value:] = shifted > best[value:]
+            np.maximum(best[value:], shifted, out=best[value:])
+
+    solution = np.zeros(len(values), dtype=np.int64)
+    w = capacity
+    for i in range(len(values) - 1, -1, -1):
+        if take[i, w]:
+            solution[i] = 1
+            w -= values[i]
+    return solution
+
+
+def solve_subset_sum(values, capacity):
+    """0/1 solution vector of a largest subset sum of values not exceeding capacity, in O(capacity) memory.
+
+    Hirschberg-style divide and conquer: the best sums of each half of the items, for every capacity,
+    give the best split of the capacity between the halves, and each half is then solved for its share.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    solution = np.zeros(len(values), dtype=np.int64)
+    stack = [(0, len(values), capacity)]
+    while stack:
+        lo, hi, capacity = stack.pop()
+        if capacity <= 0 or hi == lo:
+            continue
+        if hi - lo == 1 or (hi - lo) * (capacity + 1) <= table_cells:
+            solution[lo:hi] = table_solution(values[lo:hi], capacity)
+            continue
+        mid = (lo + hi) // 2
+        first = best_sums(values[lo:mid], capacity)
+        second = best_sums(values[mid:hi], capacity)
+        totals = first + second[::-1]
+        split = int(np.argmax(totals))
+        # Each half only needs exactly the sum it contributes
+        stack.append((lo, mid, int(first[split])))
+        stack.append((mid, hi, int(second[capacity - split])))
+    return solution
+
+
+def bitset_subset_sum(values, capacity):
+    """0/1 solution vector of a largest subset sum of values not exceeding capacity.
+
+    Reachable sums are the set bits of one Python integer, and adding an item is a shift-or. Only a
+    snapshot every block of items is kept; backtracking replays one block at a time from its
+    snapshot. Items after the block in which the capacity itself becomes reachable are never added.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    items = values.tolist()
+    solution = np.zeros(len(items), dtype=np.int64)
+    if capacity < 0:
+        return solution
+    block = bitset_block_items or max(1, math.isqrt(len(items)))
+    mask = (1 << (capacity + 1)) - 1
+
+    reach = 1
+    snapshots = []
+    end = len(items)
+    for start in range(0, len(items), block):
+        snapshots.append(reach)
+        for value in items[start:start + block]:
+            if value <= capacity:
+                reach |= reach << value
+                # Bits past the capacity are only trimmed once they double the work per shift
+                if reach.bit_length() > 2 * (capacity + 1):
+                    reach &= mask
+        if (reach >> capacity) & 1:
+            end = min(start + block, len(items))
+            break
+
+    reached = (reach & mask).bit_length() - 1
+    for b in range(len(snapshots) - 1, -1, -1):
+        start = b * block
+        stop = min(start + block, end)
+        # before[j] holds the reachable sums before item start + j
+        before = [snapshots[b]]
+        for value in items[start:stop - 1]:
+            before.append(before[-1] | (before[-1] << value) & mask if value <= capacity else before[-1])
+        for i in range(stop - 1, start - 1, -1):
+            if not (before[i - start] >> reached) & 1:
+                solution[i] = 1
+                reached -= items[i]
+    return solution
+
+
+class SolvedInstance:
+    """Reachable subset sums of one item set up to a capacity, kept to answer many targets.
+
+    first[s] is the index of the earliest item with which sum s becomes reachable (-1 for the empty
+    sum 0, unreached for sums no subset hits), so s - values[first[s]] is reachable with earlier items
+    only and following first from any reachable sum walks back to a distinct set of items. best_sum()
+    is a lookup in the running maximum of the reachable sums; solution() follows first in O(n). Added
+    items and larger targets only fill in what is new.
+    """
+
+    unreached = np.iinfo(np.int32).max
+
+    def __init__(self, values=(), capacity=0):
+        self.values = np.zeros(0, dtype=np.int64)
+        self.capacity = -1
+        self.first = np.zeros(0, dtype=np.int32)
+        self.best = None  # best[t]: largest reachable sum not above t, rebuilt lazily after changes
+        self.extend(capacity)
+        self.add_items(values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def reach(self, item, lo, hi):
+        """Mark the sums in [lo, hi] that item newly reaches from sums reachable before it."""
+        value = int(self.values[item])
+        lo = max(lo, value)
+        if lo > hi:
+            return
+        fresh = (self.first[lo - value:hi + 1 - value] < item) & (self.first[lo:hi + 1] == self.unreached)
+        self.first[lo:hi + 1][fresh] = item
+
+    def add_items(self, values):
+        start = len(self.values)
+        self.values = np.concatenate((self.values, np.asarray(values, dtype=np.int64)))
+        for item in range(start, len(self.values)):
+            self.reach(item, 0, self.capacity)
+        self.best = None
+
+    def extend(self, capacity):
+        """Grow the reachable sums to capacity, replaying every item over the new sums only."""
+        if capacity <= self.capacity:
+            return
+        old = self.capacity
+        self.first = np.concatenate((self.first, np.full(capacity - old, self.unreached, dtype=np.int32)))
+        if old < 0:
+            self.first[0] = -1
+        self.capacity = capacity
+        for item in range(len(self.values)):
+            self.reach(item, old + 1, capacity)
+        self.best = None
+
+    def best_sum(self, target):
+        """Largest subset sum not exceeding target, or -1 if target is negative."""
+        if target < 0:
+            return -1
+        self.extend(target)
+        if self.best is None:
+            sums = np.arange(self.capacity + 1, dtype=sum_dtype(self.capacity))
+            self.best = np.maximum.accumulate(np.where(self.first != self.unreached, sums, 0))
+        return int(self.best[target])
+
+    def solution(self, target):
+        """0/1 solution vector of a largest subset sum not exceeding target."""
+        solution = np.zeros(len(self.values), dtype=np.int64)
+        reached = self.best_sum(target)
+        while reached > 0:
+            item = self.first[reached]
+            solution[item] = 1
+            reached -= int(self.values[item])
+        return solution
+
+
+class BranchAndBound:
+    """Exact depth-first branch and bound for capacities far beyond what the DP tables can hold.
+
+    Items are sorted by efficiency, which with value equal to weight is a sort by value, and the
+    Dantzig LP bound of a node reduces to min(capacity, sum so far + all remaining values); a solution
+    that fills the capacity exactly is therefore optimal. The greedy solution up to the break item is
+    first improved by single additions and one-for-one swaps. Then only a core of items around the break
+    item is searched, with the larger items before it taken and the smaller ones after it left out; the
+    core is doubled until the capacity is filled or the core spans every item. After leaving out an
+    item, the equal-valued items right after it are left out too, since taking one of them instead
+    would only repeat a solution.
+
+    Subset sums over large values can need exponentially many nodes, so each core search stops after
+    core_node_limit nodes. nodes, elapsed and optimal (False if the limit cut the full search short)
+    report on the last solve().
+    """
+
+    def __init__(self, values, capacity):
+        self.values = np.asarray(values, dtype=np.int64)
+        self.capacity = capacity
+        self.nodes = 0
+        self.elapsed = 0.0
+        self.optimal = False
+
+    def solve(self):
+        """0/1 solution vector of a largest subset sum not exceeding the capacity."""
+        started = time.perf_counter()
+        self.nodes = 0
+        self.optimal = False
+        n = len(self.values)
+        taken = np.zeros(n, dtype=np.int64)
+        if self.capacity < 0:
+            self.elapsed = time.perf_counter() - started
+            return taken
+
+        order = np.argsort(-self.values, kind='stable')
+        ordered = self.values[order].tolist()
+        prefix = np.concatenate(([0], np.cumsum(self.values[order])))
+        brk = int(np.searchsorted(prefix, self.capacity, side='right')) - 1  # Items before it all fit
+        taken[order[:brk]] = 1
+        total = self.improve(taken)
+
+        half = core_items // 2
+        while total < self.capacity:
+            lo, hi = max(0, brk - half), min(n, brk + half)
+            fixed = int(prefix[lo])
+            core_sum, core_taken, exhausted = self.search(ordered[lo:hi], self.capacity - fixed, total - fixed)
+            if core_taken is not None:
+                taken[:] = 0
+                taken[order[:lo]] = 1
+                taken[order[lo:hi]] = core_taken
+                total = fixed + core_sum
+            if lo == 0 and hi == n:
+                self.optimal = exhausted
+                break
+            half *= 2
+        self.optimal = self.optimal or total == self.capacity
+
+        self.elapsed = time.perf_counter() - started
+        return taken
+
+    def improve(self, taken):
+        """Raise the sum of a feasible 0/1 vector in place by the best single addition or one-for-one swap
+        until neither helps; returns the new sum."""
+        total = int(self.values @ taken)
+        while total < self.capacity:
+            inside = np.flatnonzero(taken)
+            outside = np.flatnonzero(taken == 0)
+            if not len(outside):
+                break
+            outside = outside[np.argsort(self.values[outside], kind='stable')]
+            outside_values = self.values[outside]
+            # For nothing (a plain addition) and for every taken item, the largest left-out item that fits instead
+            removed = np.concatenate(([0], self.values[inside]))
+            slot = np.searchsorted(outside_values, removed + (self.capacity - total), side='right') - 1
+            gains = np.where(slot >= 0, outside_values[np.maximum(slot, 0)] - removed, 0)
+            k = int(np.argmax(gains))
+            if gains[k] <= 0:
+                break
+            taken[outside[slot[k]]] = 1
+            if k > 0:
+                taken[inside[k - 1]] = 0
+            total += int(gains[k])
+        return total
+
+    def search(self, values, capacity, incumbent):
+        """Depth-first search over values in decreasing order for a sum above incumbent.
+
+        Returns the best sum, its 0/1 vector (None if nothing beat incumbent) and whether the search ran
+        to completion.
+        """
+        n = len(values)
+        suffix = np.concatenate((np.cumsum(values[::-1])[::-1], [0])).tolist()
+        negated = [-v for v in values]  # Ascending, for bisecting the first item that fits
+        run_end = [n] * (n + 1)  # First index after the run of values equal to values[i]
+        for i in range(n - 2, -1, -1):
+            run_end[i] = run_end[i + 1] if values[i] == values[i + 1] else i + 1
+
+        best, best_path = incumbent, None
+        # Frames: (next item, sum so far, value just left out, taken items as a (index, rest) chain)
+        stack = [(0, 0, None, None)]
+        nodes = 0
+        while stack and best < capacity and nodes < core_node_limit:
+            i, current, skipped, path = stack.pop()
+            nodes += 1
+            if current > best:
+                best, best_path = current, path
+            if min(capacity, current + suffix[i]) <= best:
+                continue
+
+            # Leave out items that no longer fit and values equal to one just left out
+            i = bisect.bisect_left(negated, current - capacity, i)
+            if i < n and values[i] == skipped:
+                i = run_end[i]
+            if i == n or min(capacity, current + suffix[i]) <= best:
+                continue
+
+            stack.append((i + 1, current, values[i], path))
+            stack.append((i + 1, current + values[i], None, (i, path)))
+        self.nodes += nodes
+
+        best_taken = None
+        if best > incumbent:
+            best_taken = [0] * n
+            while best_path is not None:
+                index, best_path = best_path
+                best_taken[index] = 1
+        return best, best_taken, not stack or best >= capacity
+
+
+def branch_and_bound(values, capacity):
+    return BranchAndBound(values, capacity).solve()
+
+
+def auto_subset_sum(values, capacity):
+    """Bitset engine while its work stays within auto_bitset_words, branch and bound beyond that."""
+    if len(values) * (capacity + 1) // 64 <= auto_bitset_words:
+        return bitset_subset_sum(values, capacity)
+    return branch_and_bound(values, capacity)
+
+
+solvers = {
+    'dp': solve_subset_sum,
+    'bitset': bitset_subset_sum,
+    'branch-and-bound': branch_and_bound,
+    'auto': auto_subset_sum,
+}
 
 
 class UI(tk.Tk):
@@ -71,7 +398,9 @@ class UI(tk.Tk):
         self.state("zoomed")
         self.canvas = Canvas(self)
         self.canvas.place(x=0, y=0, width=self.width, height=self.height)
-        self.items_list = []
+        self.items = None
+        self.instance = None  # SolvedInstance of the current items, built once they are queried again
+        self.runs = 0  # Runs on the current items
 
         menu_bar = Menu(self)
         self['menu'] = menu_bar
@@ -87,16 +416,7 @@ class UI(tk.Tk):
         self.target = 0
 
         def set_target():
-            target_set = []
-            for x in range(int(num_items * frac_target)):
-                item = self.items_list[random.randint(0, len(self.items_list) - 1)]
-                while item in target_set:
-                    item = self.items_list[random.randint(0, len(self.items_list) - 1)]
-                target_set.append(item)
-            total = 0
-            for item in target_set:
-                total += item.value
-            self.target = total
+            self.target = self.items.random_target(frac_target)
             self.draw_target()
 
         menu_K.add_command(label="Get Target", command=set_target, underline=0)
@@ -109,53 +429,17 @@ class UI(tk.Tk):
 
         self.mainloop()
 
-    def get_rand_item(self):
-        i1 = Item()
-        for i2 in self.items_list:
-            if i1.value == i2.value:
-                return None
-        return i1
-
-    def add_item(self):
-        item = self.get_rand_item()
-        while item is None:
-            item = self.get_rand_item()
-        self.items_list.append(item)
-
     def generate_knapsack(self):
-        for i in range(num_items):
-            self.add_item()
-
-        item_max = 0
-        item_min = 9999
-        for item in self.items_list:
-            item_min = min(item_min, item.value)
-            item_max = max(item_max, item.value)
-
-        w = self.width - screen_padding
-        h = self.height - screen_padding
-        num_rows = math.ceil(num_items / 6)
-        row_w = w / 8 - item_padding
-        row_h = (h - 200) / num_rows
-
-        for x in range(0, 6):
-            for y in range(0, num_rows):
-                if x * num_rows + y >= num_items:
-                    break
-                item = self.items_list[x * num_rows + y]
-                item_w = row_w / 2
-                item_h = max(item.value / item_max * row_h, 1)
-                item.place(screen_padding + x * row_w + x * item_padding,
-                           screen_padding + y * row_h + y * item_padding,
-                           item_w,
-                           item_h)
+        self.items = generate_items(num_items, min_value, max_value)
+        self.instance = None
+        self.runs = 0
+        self.items.place(self.width, self.height, screen_padding)
 
     def clear_canvas(self):
         self.canvas.delete("all")
 
     def draw_items(self):
-        for item in self.items_list:
-            item.draw(self.canvas)
+        self.items.draw(self.canvas)
 
     def draw_target(self):
         x = (self.width - screen_padding) / 8 * 7
@@ -177,34 +461,22 @@ class UI(tk.Tk):
                                 font=('Arial', 18))
 
     def draw_genome(self, genome):
-        for i, is_active in enumerate(genome):
-            self.items_list[i].draw(self.canvas, is_active)
+        self.items.draw(self.canvas, genome)
 
     def run(self):
-        # DP Algorithm
-        capacity = self.target
-        values = [item.value for item in self.items_list]
-        n = len(values)
-
-        dp = [[0] * (capacity + 1) for _ in range(n + 1)]
-        for i in range(1, n + 1):
-            for w in range(capacity + 1):
-                if values[i - 1] <= w:
-                    dp[i][w] = max(dp[i - 1][w], dp[i - 1][w - values[i - 1]] + values[i - 1])
-                else:
-                    dp[i][w] = dp[i - 1][w]
-
-        # Backtrack to find solution
-        solution = [0] * n
-        w = capacity
-        for i in range(n, 0, -1):
-            if dp[i][w] != dp[i - 1][w]:
-                solution[i - 1] = 1
-                w -= values[i - 1]
+        values = self.items.values
+        # The first run uses the configured solver; building a SolvedInstance only pays off for repeat targets
+        if self.instance is None and self.runs and self.target <= instance_sums:
+            self.instance = SolvedInstance(values)
+        if self.instance is not None and self.target <= instance_sums:
+            solution = self.instance.solution(self.target)
+        else:
+            solution = solvers[solver](values, self.target)
+        self.runs += 1
 
         self.after(0, self.clear_canvas)
         self.after(0, self.draw_target)
-        self.after(0, self.draw_sum, sum(item.value for item, s in zip(self.items_list, solution) if s), self.target)
+        self.after(0, self.draw_sum, int(values @ solution), self.target)
         self.after(0, self.draw_genome, solution)
 
 
@@ -0,0 +1,269 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# GA parameters, shared by the UI in Knapsack.py and the batch engine in KnapsackBatch.py
+frac_target = 0.75  # Share of the items in a target, and the chance of each gene in a random genome
+
+num_generations = 2000
+pop_size = 100
+elitism_count = 5
+mutation_rate = 0.05
+tournament_size = 5
+chunk_genes = 1 << 20  # Genes handled at once by batched passes, keeping temporaries cache-friendly
+sum_block_size = 64  # Genes per carried partial sum
+island_count = 1  # Subpopulations evolved in parallel processes when greater than 1
+migration_interval = 20  # Generations each island runs between migrations
+migration_size = 2  # Elites each island sends per migration
+migration_topology = 'ring'  # 'ring' sends to the next island, 'random' to a random other island
+greedy_seed_fraction = 0.25  # Share of the initial population filled by randomized greedy
+repair_children = True  # Make every child fit the target and leave no item out that still fits
+
+
+def rows_per_chunk(num_items):
+    return max(1, chunk_genes // max(num_items, 1))
+
+
+def population_sums(population, values):
+    """Value sum of every genome (row) of a bit matrix, as one matrix-vector product per row chunk."""
+    weights = values.astype(np.float64)  # BLAS product; exact for integer sums below 2**53
+    sums = np.empty(len(population), dtype=np.int64)
+    chunk_rows = rows_per_chunk(len(values))
+    for start in range(0, len(population), chunk_rows):
+        chunk = population[start:start + chunk_rows]
+        sums[start:start + chunk_rows] = np.rint(chunk.astype(np.float64) @ weights)
+    return sums
+
+
+def population_block_sums(population, values):
+    """Value sums of every sum_block_size-gene block of every genome, shape (len(population), num_blocks)."""
+    num_items = population.shape[1]
+    num_blocks = -(-num_items // sum_block_size)
+    weights = np.zeros(num_blocks * sum_block_size)
+    weights[:num_items] = values
+    weights = weights.reshape(num_blocks, sum_block_size)
+    blocks = np.empty((len(population), num_blocks), dtype=np.int64)
+    chunk_rows = rows_per_chunk(num_items)
+    for start in range(0, len(population), chunk_rows):
+        chunk = population[start:start + chunk_rows]
+        padded = np.zeros((len(chunk), num_blocks * sum_block_size))
+        padded[:, :num_items] = chunk
+        blocks[start:start + chunk_rows] = np.rint(
+            np.einsum('rbk,bk->rb', padded.reshape(len(chunk), num_blocks, sum_block_size), weights))
+    return blocks
+
+
+def walk_cumsum(amounts, starts):
+    """Running totals along each row read cyclically from its start column, left in column order."""
+    totals = np.cumsum(amounts, axis=1)
+    wrapped = totals[:, -1:].copy()
+    totals -= np.where(starts > 0, totals[np.arange(len(amounts)), starts - 1], 0)[:, None]
+    np.add(totals, wrapped, out=totals, where=np.arange(amounts.shape[1]) < starts[:, None])
+    return totals
+
+
+class GeneticKnapsack:
+    """Knapsack GA over a (pop_size, num_items) boolean population matrix.
+
+    Every genome carries its value sum split into blocks of sum_block_size genes. Elites keep theirs,
+    a child takes whole blocks from its parents and only recomputes the block holding the crossover
+    cut, and mutation adds or subtracts just the flipped values. With verify set, every generation is
+    also re-evaluated from scratch and checked against the carried sums.
+    """
+
+    def __init__(self, values, target, rng=None, verify=False, population=None, block_sums=None):
+        self.values = np.asarray(values, dtype=np.int64)
+        self.target = target
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.verify = verify
+        seeded = 0
+        if population is None:
+            population = np.empty((pop_size, len(self.values)), dtype=bool)
+            chunk_rows = rows_per_chunk(len(self.values))
+            for start in range(0, pop_size, chunk_rows):
+                rows = len(population[start:start + chunk_rows])
+                population[start:start + chunk_rows] = self.rng.random((rows, len(self.values))) < frac_target
+            # Greedy seeds start empty and are filled by repair in a random order each
+            seeded = int(pop_size * greedy_seed_fraction)
+            population[:seeded] = False
+        self.population = population
+        self.block_sums = population_block_sums(population, self.values) if block_sums is None else block_sums
+        if seeded:
+            self.repair(self.population[:seeded], self.block_sums[:seeded])
+        self.evaluate()
+
+    def evaluate(self):
+        self.sums = self.block_sums.sum(axis=1)
+        if self.verify and not np.array_equal(self.sums, population_sums(self.population, self.values)):
+            raise RuntimeError('Carried value sums drifted from a full re-evaluation')
+        # Penalize solutions that exceed the target, otherwise maximize value while staying under it
+        self.fitness = np.where(self.sums > self.target, 0, self.sums / self.target)
+
+    def best(self):
+        """Index of the fittest genome."""
+        return int(np.argmax(self.fitness))
+
+    def elites(self, count):
+        """Indices of the count fittest genomes."""
+        return np.argpartition(-self.fitness, count - 1)[:count]
+
+    def replace_worst(self, genomes, block_sums):
+        """Overwrite the least fit genomes with incoming ones, such as migrants from another island."""
+        worst = np.argpartition(self.fitness, len(genomes) - 1)[:len(genomes)]
+        self.population[worst] = genomes
+        self.block_sums[worst] = block_sums
+        self.evaluate()
+
+    def select_parents(self, count):
+        """Winners of count tournaments of tournament_size random genomes each."""
+        entrants = self.rng.integers(len(self.population), size=(count, tournament_size))
+        winners = np.argmax(self.fitness[entrants], axis=1)
+        return entrants[np.arange(count), winners]
+
+    def crossover(self, parents1, parents2):
+        """One-point crossover: genes before each child's cut come from the first parent.
+
+        Returns the children and their block sums.
+        """
+        num_items = self.population.shape[1]
+        num_blocks = self.block_sums.shape[1]
+        cuts = self.rng.integers(0, num_items, size=len(parents1))
+        from_first = np.arange(num_items) < cuts[:, None]
+        children = np.where(from_first, self.population[parents1], self.population[parents2])
+
+        cut_blocks = cuts // sum_block_size
+        blocks = np.where(np.arange(num_blocks) < cut_blocks[:, None],
+                          self.block_sums[parents1], self.block_sums[parents2])
+        # The block holding the cut mixes both parents, so it is summed from the child itself
+        columns = cut_blocks[:, None] * sum_block_size + np.arange(sum_block_size)
+        in_range = columns < num_items
+        columns = np.minimum(columns, num_items - 1)
+        genes = np.take_along_axis(children, columns, axis=1) & in_range
+        blocks[np.arange(len(children)), cut_blocks] = (genes * self.values[columns]).sum(axis=1)
+        return children, blocks
+
+    def mutate(self, children, blocks):
+        """Flip each gene with probability mutation_rate, drawing only the positions that flip."""
+        num_items = children.shape[1]
+        flat = children.reshape(-1)
+        flips = np.sort(self.rng.integers(0, flat.size, size=self.rng.binomial(flat.size, mutation_rate)))
+        distinct = np.ones(len(flips), dtype=bool)
+        distinct[1:] = flips[1:] != flips[:-1]
+        flips = flips[distinct]
+        flat[flips] ^= True
+        rows, items = np.divmod(flips, num_items)
+        np.add.at(blocks, (rows, items // sum_block_size),
+                  np.where(flat[flips], self.values[items], -self.values[items]))
+        return children, blocks
+
+    def repair(self, genomes, blocks):
+        """Drop, then add, items in a random order per genome until each genome is within the target and
+        no item left out would still fit. Genomes and their block sums are updated in place.
+
+        Each genome walks a shared random permutation of the items from its own random starting point.
+        """
+        num_items = genomes.shape[1]
+        permutation = self.rng.permutation(num_items)
+        values = self.values[permutation]
+        chunk_rows = rows_per_chunk(num_items)
+        for start in range(0, len(genomes), chunk_rows):
+            chunk, chunk_blocks = genomes[start:start + chunk_rows], blocks[start:start + chunk_rows]
+            before = chunk[:, permutation]
+            genes = before.copy()
+            starts = self.rng.integers(0, num_items, size=len(chunk))
+            sums = chunk_blocks.sum(axis=1)
+
+            # Drop the earliest included items until the rest fits
+            over = np.flatnonzero(sums > self.target)
+            if len(over):
+                included = np.where(genes[over], values, 0)
+                kept_after = sums[over, None] - walk_cumsum(included, starts[over]) + included
+                genes[over] &= kept_after <= self.target
+                sums[over] -= np.where(genes[over], 0, included).sum(axis=1)
+
+            # Add items that still fit, first-fit in walk order, until none is left
+            active = np.arange(len(chunk))
+            while len(active):
+                slack = self.target - sums[active]
+                fits = ~genes[active] & (values <= slack[:, None])
+                active_fits = fits.any(axis=1)
+                active, fits, slack = active[active_fits], fits[active_fits], slack[active_fits]
+                added = fits & (walk_cumsum(np.where(fits, values, 0), starts[active]) <= slack[:, None])
+                genes[active] |= added
+                sums[active] += np.where(added, values, 0).sum(axis=1)
+
+            rows, changed = np.nonzero(genes != before)
+            items = permutation[changed]
+            chunk[rows, items] = genes[rows, changed]
+            np.add.at(chunk_blocks, (rows, items // sum_block_size),
+                      np.where(genes[rows, changed], self.values[items], -self.values[items]))
+
+    def next_generation(self):
+        num_children = len(self.population) - elitism_count
+        elites = self.elites(elitism_count)
+        children, blocks = self.mutate(*self.crossover(self.select_parents(num_children),
+                                                       self.select_parents(num_children)))
+        if repair_children:
+            self.repair(children, blocks)
+        self.population = np.concatenate((self.population[elites], children))
+        self.block_sums = np.concatenate((self.block_sums[elites], blocks))
+        self.evaluate()
+
+
+def evolve_islands(values, target):
+    """Evolve island_count populations in a process pool, migrating each island's top migration_size
+    genomes every migration_interval generations.
+
+    Yields (generation, best genome, best sum) after every migration until the target is hit.
+    """
+    seeds = np.random.SeedSequence()
+    rng = np.random.default_rng(seeds.spawn(1)[0])
+    islands = [GeneticKnapsack(values, target, np.random.default_rng(seed)) for seed in seeds.spawn(island_count)]
+    best_genome, best_sum, best_fitness = None, 0, -1.0
+
+    with ProcessPoolExecutor(island_count, initializer=_attach_island, initargs=(values, target)) as pool:
+        for generation in range(0, num_generations, migration_interval):
+            generations = min(migration_interval, num_generations - generation)
+            jobs = [pool.submit(_evolve_island, island.population, island.block_sums, generations, seed)
+                    for island, seed in zip(islands, seeds.spawn(island_count))]
+            islands = [GeneticKnapsack(values, target, rng, population=population, block_sums=block_sums)
+                       for population, block_sums in (job.result() for job in jobs)]
+
+            for island in islands:
+                best = island.best()
+                if island.fitness[best] > best_fitness:
+                    best_genome = island.population[best].copy()
+                    best_sum, best_fitness = int(island.sums[best]), island.fitness[best]
+            yield generation + generations, best_genome, best_sum
+            if best_fitness >= 1:
+                return
+
+            # Collect every island's emigrants before any island takes in immigrants
+            migrants = []
+            for island in islands:
+                elites = island.elites(migration_size)
+                migrants.append((island.population[elites], island.block_sums[elites]))
+            if migration_topology == 'random':
+                destinations = (np.arange(island_count) + rng.integers(1, island_count, size=island_count)) % island_count
+            else:
+                destinations = (np.arange(island_count) + 1) % island_count
+            for (genomes, block_sums), destination in zip(migrants, destinations):
+                islands[destination].replace_worst(genomes, block_sums)
+
+
+# Instance values and target of an island worker process, set up once by _attach_island
+_island = {}
+
+
+def _attach_island(values, target):
+    _island['values'] = np.asarray(values, dtype=np.int64)
+    _island['target'] = target
+
+
+def _evolve_island(population, block_sums, generations, seed):
+    ga = GeneticKnapsack(_island['values'], _island['target'], np.random.default_rng(seed),
+                         population=population, block_sums=block_sums)
+    for _ in range(generations):
+        if ga.fitness[ga.best()] >= 1:
+            break
+        ga.next_generation()
+    return ga.population, ga.block_sums
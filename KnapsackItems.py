@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+
+item_padding = 5
+stroke_width = 5
+max_rendered_items = 600  # Items given drawing geometry; the rest only exist in the value array
+
+
+class ItemStore:
+    """Knapsack items as NumPy arrays of values and colors; drawing geometry exists only for rendered items."""
+
+    def __init__(self, values, colors):
+        self.values = np.asarray(values, dtype=np.int64)
+        self.colors = np.asarray(colors, dtype=np.uint8)  # (n, 3) RGB
+        self.geometry = np.empty((0, 4))  # x, y, w, h of the first len(geometry) items
+
+    def __len__(self):
+        return len(self.values)
+
+    def random_target(self, fraction, rng=None):
+        """Value sum of a random subset holding the given fraction of the items."""
+        rng = np.random.default_rng() if rng is None else rng
+        chosen = rng.choice(len(self.values), size=int(len(self.values) * fraction), replace=False)
+        return int(self.values[chosen].sum())
+
+    def place(self, width, height, screen_padding):
+        """Lay out up to max_rendered_items items in six columns, bars scaled by value."""
+        count = min(len(self.values), max_rendered_items)
+        if count == 0:
+            self.geometry = np.empty((0, 4))
+            return
+        w = width - screen_padding
+        h = height - screen_padding
+        num_rows = math.ceil(count / 6)
+        row_w = w / 8 - item_padding
+        row_h = (h - 200) / num_rows
+
+        column, row = np.divmod(np.arange(count), num_rows)
+        self.geometry = np.column_stack((screen_padding + column * (row_w + item_padding),
+                                         screen_padding + row * (row_h + item_padding),
+                                         np.full(count, row_w / 2),
+                                         np.maximum(self.values[:count] / self.values.max() * row_h, 1)))
+
+    def color(self, i):
+        return '#{:02x}{:02x}{:02x}'.format(*self.colors[i].tolist())
+
+    def draw(self, canvas, active=None):
+        """Draw the placed items, filled where active (a genome or solution vector) is set."""
+        values = self.values[:len(self.geometry)].tolist()
+        for i, (x, y, w, h) in enumerate(self.geometry.tolist()):
+            color = self.color(i)
+            canvas.create_text(x + w + item_padding + stroke_width * 2, y + h / 2, text=f'{values[i]}')
+            canvas.create_rectangle(x, y, x + w, y + h,
+                                    fill=color if active is not None and active[i] else '',
+                                    outline=color,
+                                    width=stroke_width)
+
+
+def generate_items(count, min_value, max_value, rng=None):
+    """count items with distinct random values in [min_value, max_value] and random colors."""
+    rng = np.random.default_rng() if rng is None else rng
+    span = max_value - min_value + 1
+    if count > span:
+        raise ValueError(f'Cannot draw {count} distinct values from [{min_value}, {max_value}]')
+    values = min_value + rng.choice(span, size=count, replace=False)
+    colors = rng.integers(0x10, 0x100, size=(count, 3))
+    return ItemStore(values, colors)
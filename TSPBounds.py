@@ -0,0 +1,131 @@
+import numpy as np
+
+ascent_iterations = 100  # Subgradient steps of the Held-Karp ascent
+ascent_patience = 10  # Steps without a better bound before the step size is halved
+initial_step_scale = 2.0
+
+
+class OneTree:
+    """Minimum 1-tree under node penalties pi: a spanning tree on cities 1..n-1 plus two edges at city 0."""
+
+    def __init__(self, dist, pi):
+        n = len(dist)
+        self.pi = pi
+        in_tree = np.zeros(n, dtype=bool)
+        in_tree[0] = True
+        key = np.full(n, np.inf)
+        parent = np.full(n, -1)
+        key[1] = 0
+        order = []
+        # Prim's algorithm on the penalized costs d(i, j) + pi[i] + pi[j]
+        for _ in range(n - 1):
+            u = int(np.argmin(np.where(in_tree, np.inf, key)))
+            in_tree[u] = True
+            order.append(u)
+            row = dist[u] + pi[u] + pi
+            better = ~in_tree & (row < key)
+            key[better] = row[better]
+            parent[better] = u
+
+        # The two cheapest edges at the special city 0
+        row = dist[0] + pi[0] + pi
+        row[0] = np.inf
+        ends = np.argpartition(row, 1)[:2]
+        self.special_ends = ends
+        self.special_second = row[ends].max()
+
+        self.parent = parent  # parent[i] is i's tree parent, -1 for city 0 and the root (city 1)
+        self.edge_cost = key  # Penalized cost of the edge from i to parent[i]
+        self.order = np.array(order)  # Parents come before their children
+        self.cost = key[1:].sum() + row[ends].sum()
+        self.degree = np.bincount(parent[parent >= 0], minlength=n) + (parent >= 0)
+        self.degree[0] = 2
+        self.degree[ends] += 1
+
+    def lower_bound(self):
+        return float(self.cost - 2 * self.pi.sum())
+
+
+class HeldKarpBound:
+    """Held-Karp lower bound from a subgradient ascent on 1-tree node penalties."""
+
+    def __init__(self, dist, upper_bound, iterations=None):
+        self.dist = dist
+        n = len(dist)
+        pi = np.zeros(n)
+        self.value = -np.inf
+        step_scale = initial_step_scale
+        since_improvement = 0
+
+        for _ in range(ascent_iterations if iterations is None else iterations):
+            tree = OneTree(dist, pi)
+            bound = tree.lower_bound()
+            if bound > self.value:
+                self.value, self.tree = bound, tree
+                since_improvement = 0
+            else:
+                since_improvement += 1
+                if since_improvement >= ascent_patience:
+                    step_scale /= 2
+                    since_improvement = 0
+
+            subgradient = tree.degree - 2
+            norm = float(subgradient @ subgradient)
+            if norm == 0:
+                break  # Every city has degree 2, so the 1-tree is an optimal tour
+            step = step_scale * max(upper_bound - bound, 1e-9 * abs(upper_bound)) / norm
+            pi = pi + step * subgradient
+
+        self.pi = self.tree.pi
+
+    def gap(self, distance):
+        """Relative excess of a tour length over the bound."""
+        return (distance - self.value) / self.value if self.value > 0 else np.inf
+
+    def alpha_row(self, i, depth_levels, on_path):
+        """Alpha-nearness of every city to city i: how much forcing edge (i, j) raises the minimum 1-tree."""
+        tree, pi = self.tree, self.pi
+        cost = self.dist[i] + pi[i] + pi
+        if i == 0:
+            alpha = np.maximum(cost - tree.special_second, 0)
+            alpha[0] = np.inf
+            return alpha
+
+        # beta[j] is the most expensive tree edge on the path between i and j
+        beta = np.full(len(pi), -np.inf)
+        path = [i]
+        node = i
+        while tree.parent[node] >= 0:
+            up = tree.parent[node]
+            beta[up] = max(beta[node], tree.edge_cost[node])
+            path.append(up)
+            node = up
+        on_path[path] = True
+        for level in depth_levels:
+            level = level[~on_path[level]]
+            beta[level] = np.maximum(beta[tree.parent[level]], tree.edge_cost[level])
+        on_path[path] = False
+
+        alpha = cost - beta
+        alpha[0] = max(cost[0] - tree.special_second, 0)
+        alpha[i] = np.inf
+        return alpha
+
+    def alpha_candidates(self, k):
+        """Return an (n, k) array of the k alpha-nearest cities of every city, ties broken by distance."""
+        n = len(self.pi)
+        k = min(k, n - 1)
+        parent = self.tree.parent
+        depth = np.zeros(n, dtype=np.int64)
+        for node in self.tree.order[1:]:
+            depth[node] = depth[parent[node]] + 1
+        tree_nodes = self.tree.order
+        depth_levels = [tree_nodes[depth[tree_nodes] == d] for d in range(1, depth.max() + 1)]
+        on_path = np.zeros(n, dtype=bool)
+
+        candidates = np.empty((n, k), dtype=np.int64)
+        for i in range(n):
+            alpha = self.alpha_row(i, depth_levels, on_path)
+            nearest = np.lexsort((self.dist[i], alpha))[:k]
+            candidates[i] = nearest
+        return candidates
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+import TSPLib
+
+memory_budget = 2 * 1024 ** 3  # Bytes a dense float64 matrix may use
+disk_budget = 16 * 1024 ** 3  # Bytes a memory-mapped float32 matrix may use
+row_block_size = 1024  # Rows computed at once when filling a matrix
+tile_size = 256  # Cities per side of an on-demand tile
+tile_cache_bytes = 256 * 1024 ** 2
+
+
+class DistanceBackend:
+    """Common interface: dist[i, j], dist[rows, cols], dist[row(s)], len(dist) and tour_length(path)."""
+
+    def __len__(self):
+        return self.n
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self[:], dtype=dtype)
+
+    def tour_length(self, path):
+        path = np.asarray(path)
+        return float(self[path, np.roll(path, 1)].sum(dtype=np.float64))  # float32 backends lose digits
+
+
+def fill_rows(out, coords, metric):
+    for start in range(0, len(coords), row_block_size):
+        stop = start + row_block_size
+        out[start:stop] = metric(coords[start:stop, None, :], coords[None, :, :])
+    return out
+
+
+class DenseDistance(DistanceBackend):
+    """Full float64 matrix in memory."""
+
+    def __init__(self, coords, metric=TSPLib.euclidean):
+        self.n = len(coords)
+        self.matrix = fill_rows(np.empty((self.n, self.n)), coords, metric)
+
+    def __getitem__(self, index):
+        return self.matrix[index]
+
+
+class MemmapDistance(DistanceBackend):
+    """Float32 matrix in a memory-mapped temporary file, paged in by the OS as rows are touched."""
+
+    def __init__(self, coords, metric=TSPLib.euclidean, directory=None):
+        self.n = len(coords)
+        handle, self.path = tempfile.mkstemp(suffix='.dist', dir=directory)
+        os.close(handle)
+        # Only the creating process removes the file; unpickled copies in workers just reopen it
+        weakref.finalize(self, os.remove, self.path)
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode='w+', shape=(self.n, self.n))
+        fill_rows(self.matrix, coords, metric)
+        self.matrix.flush()
+
+    def __getstate__(self):
+        return {'n': self.n, 'path': self.path}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode='r', shape=(self.n, self.n))
+
+    def __getitem__(self, index):
+        return self.matrix[index]
+
+
+class OnDemandDistance(DistanceBackend):
+    """Distances computed from the coordinates, with single lookups served from an LRU cache of tiles.
+
+    Cities are ranked along a coarse spatial grid so that a tile covers nearby cities, which is
+    where local search does almost all of its lookups.
+    """
+
+    def __init__(self, coords, metric=TSPLib.euclidean):
+        self.n = len(coords)
+        self.coords = np.asarray(coords, dtype=float)
+        self.metric = metric
+        rank = spatial_rank(self.coords)
+        self.rank = rank.tolist()  # Plain ints are much cheaper to look up one at a time
+        self.by_rank = self.coords[np.argsort(rank)]
+        self.tiles = OrderedDict()
+        self.max_tiles = max(1, tile_cache_bytes // (tile_size * tile_size * 8))
+
+    def __getstate__(self):
+        return {'coords': self.coords, 'metric': self.metric}
+
+    def __setstate__(self, state):
+        self.__init__(state['coords'], state['metric'])
+
+    def tile(self, ti, tj):
+        key = (ti, tj)
+        block = self.tiles.get(key)
+        if block is None:
+            rows = self.by_rank[ti * tile_size:(ti + 1) * tile_size]
+            cols = self.by_rank[tj * tile_size:(tj + 1) * tile_size]
+            block = self.metric(rows[:, None, :], cols[None, :, :])
+            self.tiles[key] = block
+            if len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+        else:
+            self.tiles.move_to_end(key)
+        return block
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            i, j = index
+            if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+                ri, rj = self.rank[i], self.rank[j]
+                # The metric is symmetric, so only tiles on or above the diagonal are cached
+                if ri > rj:
+                    ri, rj = rj, ri
+                return self.tile(ri // tile_size, rj // tile_size)[ri % tile_size, rj % tile_size]
+            return self.metric(self.coords[i], self.coords[j])
+        return self.metric(self.coords[index][..., None, :], self.coords)
+
+
+def spatial_rank(coords):
+    """Rank of every city when sorted by cell of a grid holding about tile_size cities per cell."""
+    low = coords.min(axis=0)
+    span = np.maximum(coords.max(axis=0) - low, 1e-9)
+    cell_size = max(np.sqrt(span[0] * span[1] * tile_size / len(coords)), 1e-9)
+    cells = ((coords - low) // cell_size).astype(np.int64)
+    order = np.lexsort((cells[:, 1], cells[:, 0]))
+    rank = np.empty(len(coords), dtype=np.int64)
+    rank[order] = np.arange(len(coords))
+    return rank
+
+
+def make_distance(coords, metric=TSPLib.euclidean, memory=None, disk=None):
+    """Pick the dense, memory-mapped or on-demand backend from the instance size and budgets."""
+    n = len(coords)
+    memory = memory_budget if memory is None else memory
+    disk = disk_budget if disk is None else disk
+    if n * n * 8 <= memory:
+        return DenseDistance(coords, metric)
+    if n * n * 4 <= disk:
+        return MemmapDistance(coords, metric)
+    return OnDemandDistance(coords, metric)
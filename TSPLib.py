@@ -0,0 +1,121 @@
+import numpy as np
+
+coord_chunk_rows = 65536  # NODE_COORD_SECTION rows parsed per chunk
+earth_radius = 6378.388  # TSPLIB's idealized sphere for GEO instances
+
+
+def euclidean(p, q):
+    return np.hypot(p[..., 0] - q[..., 0], p[..., 1] - q[..., 1])
+
+
+def euc_2d(p, q):
+    return np.floor(euclidean(p, q) + 0.5)
+
+
+def ceil_2d(p, q):
+    return np.ceil(euclidean(p, q))
+
+
+def att(p, q):
+    """Pseudo-Euclidean distance: nint(sqrt(d^2 / 10)), rounded up if that falls short."""
+    r = np.sqrt(((p[..., 0] - q[..., 0]) ** 2 + (p[..., 1] - q[..., 1]) ** 2) / 10)
+    t = np.floor(r + 0.5)
+    return np.where(t < r, t + 1, t)
+
+
+def geo_radians(coords):
+    """TSPLIB's DDD.MM degrees-and-minutes coordinates converted to radians."""
+    degrees = np.trunc(coords)
+    return 3.141592 * (degrees + 5 * (coords - degrees) / 3) / 180
+
+
+def geo(p, q):
+    p, q = geo_radians(p), geo_radians(q)
+    q1 = np.cos(p[..., 1] - q[..., 1])
+    q2 = np.cos(p[..., 0] - q[..., 0])
+    q3 = np.cos(p[..., 0] + q[..., 0])
+    d = np.trunc(earth_radius * np.arccos(np.clip(0.5 * ((1 + q1) * q2 - (1 - q1) * q3), -1, 1)) + 1)
+    # TSPLIB defines d(i, i) as 0, but the formula above yields 1
+    return np.where((p == q).all(axis=-1), 0, d)
+
+
+# Metrics that grow with the planar distance of the raw coordinates, so spatial-grid neighbors are exact
+planar_metrics = (euclidean, euc_2d, ceil_2d, att)
+
+distance_functions = {
+    'EUC_2D': euc_2d,
+    'CEIL_2D': ceil_2d,
+    'ATT': att,
+    'GEO': geo,
+}
+
+
+class TSPInstance:
+    def __init__(self, name, edge_weight_type, coords, comment=''):
+        self.name = name
+        self.edge_weight_type = edge_weight_type
+        self.coords = coords
+        self.comment = comment
+
+    @property
+    def dimension(self):
+        return len(self.coords)
+
+    @property
+    def metric(self):
+        return distance_functions[self.edge_weight_type]
+
+
+def read_header(stream, sections):
+    """Read KEY : VALUE lines until one of the given section keywords; returns (header, section)."""
+    header = {}
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        key, _, value = line.partition(':')
+        key = key.strip().upper()
+        if key in sections:
+            return header, key
+        if key == 'EOF':
+            break
+        header[key] = value.strip()
+    return header, None
+
+
+def load_tsp(path):
+    """Load a TSPLIB .tsp file, streaming NODE_COORD_SECTION into an (n, 2) float64 array."""
+    with open(path) as stream:
+        header, section = read_header(stream, ('NODE_COORD_SECTION',))
+        edge_weight_type = header.get('EDGE_WEIGHT_TYPE', 'EUC_2D').upper()
+        if edge_weight_type not in distance_functions:
+            raise ValueError(f'Unsupported EDGE_WEIGHT_TYPE {edge_weight_type} in {path}')
+        if section is None:
+            raise ValueError(f'{path} has no NODE_COORD_SECTION')
+        dimension = int(header['DIMENSION'])
+
+        coords = np.empty((dimension, 2), dtype=np.float64)
+        remaining = dimension
+        while remaining:
+            rows = np.loadtxt(stream, ndmin=2, max_rows=min(coord_chunk_rows, remaining))
+            if len(rows) == 0:
+                raise ValueError(f'{path} ends after {dimension - remaining} of {dimension} cities')
+            coords[rows[:, 0].astype(np.int64) - 1] = rows[:, 1:3]
+            remaining -= len(rows)
+
+    return TSPInstance(header.get('NAME', ''), edge_weight_type, coords, header.get('COMMENT', ''))
+
+
+def load_tour(path):
+    """Load a TSPLIB .tour / .opt.tour file as a 0-based city index array."""
+    cities = []
+    with open(path) as stream:
+        _, section = read_header(stream, ('TOUR_SECTION',))
+        if section is None:
+            raise ValueError(f'{path} has no TOUR_SECTION')
+        for line in stream:
+            for token in line.split():
+                if token == '-1' or token == 'EOF':
+                    return np.array(cities, dtype=np.int64) - 1
+                cities.append(int(token))
+    return np.array(cities, dtype=np.int64) - 1
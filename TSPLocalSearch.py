@@ -0,0 +1,221 @@
+from collections import deque
+
+import numpy as np
+
+# Rows of the distance matrix processed at once when building neighbor lists
+neighbor_block_size = 1024
+improvement_epsilon = 1e-9
+
+
+def nearest_neighbors(dist, k):
+    """Return an (n, k) array with the k nearest cities of every city, closest first."""
+    n = len(dist)
+    k = min(k, n - 1)
+    if k < 1:
+        return np.empty((n, 0), dtype=np.int64)
+    neighbors = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, neighbor_block_size):
+        stop = min(start + neighbor_block_size, n)
+        block = np.array(dist[start:stop], dtype=float)
+        block[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        nearest = np.argpartition(block, k - 1, axis=1)[:, :k]
+        nearest_dist = np.take_along_axis(block, nearest, axis=1)
+        neighbors[start:stop] = np.take_along_axis(nearest, np.argsort(nearest_dist, axis=1), axis=1)
+    return neighbors
+
+
+class Tour:
+    """Array-backed tour with a city -> position index and in-place segment reversal."""
+
+    def __init__(self, path):
+        self.order = [int(city) for city in path]
+        self.n = len(self.order)
+        self.pos = [0] * self.n
+        for i, city in enumerate(self.order):
+            self.pos[city] = i
+
+    def next(self, city):
+        i = self.pos[city] + 1
+        return self.order[i if i < self.n else 0]
+
+    def prev(self, city):
+        return self.order[self.pos[city] - 1]
+
+    def reverse(self, a, b):
+        """Reverse the section running forward from city a to city b (inclusive)."""
+        order, pos, n = self.order, self.pos, self.n
+        i, j = pos[a], pos[b]
+        length = (j - i) % n + 1
+        # Reversing the complementary section gives the same cycle, so do the shorter one
+        if 2 * length > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+
+        if i <= j:
+            order[i:j + 1] = order[i:j + 1][::-1]
+            for k in range(i, j + 1):
+                pos[order[k]] = k
+        else:
+            for _ in range(length // 2):
+                ci, cj = order[i], order[j]
+                order[i], order[j] = cj, ci
+                pos[cj], pos[ci] = i, j
+                i = i + 1 if i + 1 < n else 0
+                j = j - 1 if j > 0 else n - 1
+
+    def move_2opt(self, a, b, c, d):
+        """Replace edges (a, b) and (c, d) by (a, c) and (b, d); b follows a and d follows c in one direction."""
+        if self.next(a) == b:
+            self.reverse(b, c)
+        else:
+            self.reverse(c, b)
+
+    def apply(self, steps):
+        for a, b, c, d in steps:
+            self.move_2opt(a, b, c, d)
+
+    def path(self):
+        return list(self.order)
+
+
+def two_opt_moves(tour, dist, neighbors, a):
+    """Improving 2-opt moves that connect city a to one of its neighbors."""
+    for succ in (tour.next, tour.prev):
+        b = succ(a)
+        d_ab = dist[a, b]
+        for c in neighbors[a]:
+            d_ac = dist[a, c]
+            # Neighbors are sorted, so no later candidate can shorten the edge at a
+            if d_ac >= d_ab:
+                break
+            d = succ(c)
+            if c == b or d == a:
+                continue
+            delta = d_ac + dist[b, d] - d_ab - dist[c, d]
+            if delta < -improvement_epsilon:
+                yield delta, ((a, b, c, d),), (a, b, c, d)
+
+
+def or_opt_moves(tour, dist, neighbors, a, max_segment_length=3):
+    """Improving moves that relocate a segment of 1-3 cities starting at a next to a neighbor of a."""
+    if tour.n < 8:
+        return
+    for succ, pred in ((tour.next, tour.prev), (tour.prev, tour.next)):
+        p = pred(a)
+        segment = [a]
+        for _ in range(max_segment_length):
+            s1, s2 = a, segment[-1]
+            nx = succ(s2)
+            d_p_s1, d_s2_nx, d_p_nx = dist[p, s1], dist[s2, nx], dist[p, nx]
+            removal_gain = d_p_s1 + d_s2_nx - d_p_nx
+            for c in neighbors[s1]:
+                d_c_s1 = dist[c, s1]
+                if d_c_s1 >= removal_gain:
+                    break
+                if c in segment:
+                    continue
+                for d in (succ(c), pred(c)):
+                    if d in segment:
+                        continue
+                    d_cd = dist[c, d]
+                    delta = d_c_s1 + dist[s2, d] - d_cd - removal_gain
+                    if delta >= -improvement_epsilon:
+                        continue
+                    if d == succ(c):
+                        # c -> s1 .. s2 -> d keeps the segment's direction
+                        steps = ((p, s1, c, d), (p, c, nx, s2), (c, s2, s1, d))
+                    else:
+                        # d -> s2 .. s1 -> c inserts it reversed
+                        steps = ((p, s1, d, c), (p, d, nx, s2))
+                    yield delta, steps, (p, nx, s1, s2, c, d)
+            segment.append(nx)
+            if nx == p or len(segment) > tour.n - 4:
+                break
+
+
+def segment_insertion_moves(tour, dist, neighbors, a):
+    """Improving 3-opt moves a b..c d..e f -> a d..e b..c f that swap two consecutive segments."""
+    n = tour.n
+    if n < 6:
+        return
+    pos = tour.pos
+    for succ, pred, sign in ((tour.next, tour.prev, 1), (tour.prev, tour.next, -1)):
+        b = succ(a)
+        d_ab = dist[a, b]
+        for d in neighbors[a]:
+            g1 = d_ab - dist[a, d]
+            if g1 <= 0:
+                break
+            if d == b:
+                continue
+            c = pred(d)
+            g1 += dist[c, d]
+            offset_d = sign * (pos[d] - pos[a]) % n
+            for e in neighbors[b]:
+                g2 = g1 - dist[e, b]
+                if g2 <= 0:
+                    break
+                if e == a or sign * (pos[e] - pos[a]) % n < offset_d:
+                    continue
+                f = succ(e)
+                delta = dist[c, f] - dist[e, f] - g2
+                if delta < -improvement_epsilon:
+                    steps = ((a, b, e, f), (a, e, d, c), (e, c, b, f))
+                    yield delta, steps, (a, b, c, d, e, f)
+
+
+# Move generators by name; each yields (delta, 2-opt steps, touched cities) for an active city
+operators = {
+    '2-opt': two_opt_moves,
+    'or-opt': or_opt_moves,
+    '3-opt': segment_insertion_moves,
+}
+
+
+class LocalSearch:
+    """Neighbor-list local search over pluggable move operators with don't-look bits."""
+
+    def __init__(self, dist, neighbors, operator_names=('2-opt', 'or-opt', '3-opt'), first_improvement=True):
+        self.dist = dist
+        self.neighbors = neighbors.tolist()
+        self.moves = [operators[name] for name in operator_names]
+        self.first_improvement = first_improvement
+
+    def improve_city(self, tour, a):
+        """Apply an improving move around city a; return the touched cities or None."""
+        best = None
+        for moves in self.moves:
+            for move in moves(tour, self.dist, self.neighbors, a):
+                if self.first_improvement:
+                    best = move
+                    break
+                if best is None or move[0] < best[0]:
+                    best = move
+            if best is not None and self.first_improvement:
+                break
+        if best is None:
+            return None
+        tour.apply(best[1])
+        return best[2]
+
+    def optimize(self, path):
+        tour = Tour(path)
+        active = [True] * tour.n
+        queue = deque(tour.order)
+
+        while queue:
+            a = queue.popleft()
+            active[a] = False
+            touched = self.improve_city(tour, a)
+            if touched is not None:
+                for city in touched:
+                    if not active[city]:
+                        active[city] = True
+                        queue.append(city)
+
+        return tour.path()
+
+
+def two_opt(dist, path, neighbors):
+    """2-opt to a local optimum using neighbor lists, don't-look bits and O(1) move deltas."""
+    return LocalSearch(dist, neighbors, ('2-opt',)).optimize(path)
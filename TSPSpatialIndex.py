@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+
+points_per_cell = 2  # Average occupancy the grid is sized for
+max_ring_search = 8  # Rings scanned before a nearest query falls back to a full scan
+
+
+class GridIndex:
+    """Uniform grid over city coordinates for nearest-unvisited queries and k-nearest candidate lists."""
+
+    def __init__(self, coords, occupancy=points_per_cell):
+        self.coords = np.asarray(coords, dtype=float)
+        self.n = len(self.coords)
+        low = self.coords.min(axis=0)
+        span = np.maximum(self.coords.max(axis=0) - low, 1e-9)
+        self.cell_size = max(math.sqrt(span[0] * span[1] * occupancy / self.n), max(span) / self.n, 1e-9)
+        self.shape = (int(span[0] // self.cell_size) + 1, int(span[1] // self.cell_size) + 1)
+        self.low = low
+
+        cx, cy = self.cell_of(self.coords)
+        self.city_cell = cx * self.shape[1] + cy
+        # Cities sorted by cell, with cell_start[c]:cell_start[c + 1] slicing the cities of cell c
+        self.cell_cities = np.argsort(self.city_cell, kind='stable')
+        counts = np.bincount(self.city_cell, minlength=self.shape[0] * self.shape[1])
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def cell_of(self, points):
+        cells = ((points - self.low) // self.cell_size).astype(np.int64)
+        return (np.clip(cells[..., 0], 0, self.shape[0] - 1),
+                np.clip(cells[..., 1], 0, self.shape[1] - 1))
+
+    def cells_in_square(self, cx, cy, ring):
+        """Cities in the (2 * ring + 1)^2 block of cells centred on cell (cx, cy)."""
+        x0, x1 = max(cx - ring, 0), min(cx + ring, self.shape[0] - 1)
+        y0, y1 = max(cy - ring, 0), min(cy + ring, self.shape[1] - 1)
+        rows = np.arange(x0, x1 + 1) * self.shape[1]
+        starts = self.cell_start[rows + y0]
+        stops = self.cell_start[rows + y1 + 1]
+        return np.concatenate([self.cell_cities[a:b] for a, b in zip(starts, stops)])
+
+    def k_nearest(self, k):
+        """Return an (n, k) array with the k nearest cities of every city, closest first."""
+        k = min(k, self.n - 1)
+        if k < 1:
+            return np.empty((self.n, 0), dtype=np.int64)
+        # Coarser cells holding about k / 2 cities each keep the per-cell Python work low
+        grid = GridIndex(self.coords, max(points_per_cell, k / 2)) if k > 2 * points_per_cell else self
+        neighbors = np.empty((self.n, k), dtype=np.int64)
+        width = grid.shape[1]
+        for cell in np.flatnonzero(np.diff(grid.cell_start)):
+            cities = grid.cell_cities[grid.cell_start[cell]:grid.cell_start[cell + 1]]
+            cx, cy = divmod(int(cell), width)
+            ring = 1
+            while True:
+                candidates = grid.cells_in_square(cx, cy, ring)
+                covers_all = ring >= max(grid.shape)
+                if len(candidates) > k or covers_all:
+                    diff = self.coords[cities, None, :] - self.coords[None, candidates, :]
+                    d = np.hypot(diff[..., 0], diff[..., 1])
+                    d[cities[:, None] == candidates[None, :]] = np.inf
+                    nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+                    nearest_d = np.take_along_axis(d, nearest, axis=1)
+                    # Anything outside the square is at least ring cells away from this cell
+                    if covers_all or nearest_d.max() <= ring * grid.cell_size:
+                        order = np.argsort(nearest_d, axis=1)
+                        neighbors[cities] = candidates[np.take_along_axis(nearest, order, axis=1)]
+                        break
+                ring += 1
+        return neighbors
+
+    def nearest_neighbor_tour(self, start=0):
+        """Greedy nearest-unvisited tour that only scans grid cells around the current city."""
+        xs, ys = self.coords[:, 0].tolist(), self.coords[:, 1].tolist()
+        width = self.shape[1]
+        cell_x, cell_y = (c.tolist() for c in self.cell_of(self.coords))
+        # Unvisited cities per cell, removed by swapping with the last entry
+        buckets = [self.cell_cities[a:b].tolist() for a, b in zip(self.cell_start[:-1], self.cell_start[1:])]
+        slot = [0] * self.n
+        for bucket in buckets:
+            for i, city in enumerate(bucket):
+                slot[city] = i
+        visited = np.zeros(self.n, dtype=bool)
+
+        def remove(city):
+            bucket = buckets[cell_x[city] * width + cell_y[city]]
+            last = bucket.pop()
+            if last != city:
+                bucket[slot[city]] = last
+                slot[last] = slot[city]
+            visited[city] = True
+
+        path = [start]
+        remove(start)
+        for _ in range(self.n - 1):
+            current = path[-1]
+            x, y, cx, cy = xs[current], ys[current], cell_x[current], cell_y[current]
+            best, best_d = -1, math.inf
+            for ring in range(max_ring_search + 1):
+                for gx in range(max(cx - ring, 0), min(cx + ring, self.shape[0] - 1) + 1):
+                    on_edge = gx == cx - ring or gx == cx + ring
+                    for gy in (range(max(cy - ring, 0), min(cy + ring, width - 1) + 1) if on_edge
+                               else (cy - ring, cy + ring)):
+                        if gy < 0 or gy >= width:
+                            continue
+                        for city in buckets[gx * width + gy]:
+                            d = math.hypot(xs[city] - x, ys[city] - y)
+                            if d < best_d:
+                                best, best_d = city, d
+                if best_d <= ring * self.cell_size:
+                    break
+            else:
+                # Remaining cities are sparse, so a vectorized scan beats growing the rings
+                remaining = np.flatnonzero(~visited)
+                d = np.hypot(self.coords[remaining, 0] - x, self.coords[remaining, 1] - y)
+                best = int(remaining[np.argmin(d)])
+            path.append(best)
+            remove(best)
+        return path
@@ -1,8 +1,21 @@
+import functools
 import math
 import random
+import sys
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
 from tkinter import ttk  # For dropdown
 
+import numpy as np
+
+import TSPBounds
+import TSPDistance
+import TSPLib
+import TSPLocalSearch
+import TSPSpatialIndex
+
 # Parameters
 num_cities = 50
 city_scale = 5
@@ -20,6 +33,24 @@ alpha = 1.0
 beta = 2.0
 num_ants = 30
 num_iterations = 100
+neighbor_count = 10  # Candidate neighbors examined per city by local search and ant steps
+local_search_operators = ('2-opt', 'or-opt', '3-opt')
+first_improvement = True  # False applies the best move found around each city instead
+aco_local_search = True  # Polish the best tour of every ACO iteration
+aco_workers = 1  # Colonies run in parallel processes when greater than 1
+aco_sync_interval = 10  # Iterations each colony runs between pheromone exchanges
+aco_exchange = 'merge'  # 'merge' averages all colonies, 'ring' mixes each with its ring neighbor
+anneal_moves_per_step = 1000  # Proposed moves per temperature step
+anneal_report_interval = 10  # Temperature steps (or tempering rounds) between yields
+parallel_tempering = False  # Run replicas at a ladder of temperatures instead of one cooling chain
+tempering_replicas = 8
+tempering_workers = 4
+tempering_rounds = 500
+gap_tolerance = None  # Stop a solver once its tour is within this fraction of the Held-Karp bound
+report_gap = True  # Track the gap to the bound while solving
+bound_city_limit = 5000  # The O(n^2) bound is skipped for larger instances
+candidate_source = 'nearest'  # 'alpha' builds candidate lists from 1-tree alpha-nearness
+exact_memory_budget = 1024 ** 3  # Bytes the Held-Karp DP tables may use
 
 
 class Node:
@@ -32,131 +63,481 @@ class Node:
                            self.x + city_scale, self.y + city_scale, fill=color)
 
 
+def stops_at_gap(solver):
+    """Track the gap of a solver's best tour to the lower bound and stop once it is within gap_tolerance."""
+    @functools.wraps(solver)
+    def run(self):
+        solutions = solver(self)
+        for path, distance in solutions:
+            if report_gap or gap_tolerance is not None:
+                self.current_gap = self.gap(distance)
+            yield path, distance
+            if gap_tolerance is not None and self.current_gap is not None and self.current_gap <= gap_tolerance:
+                solutions.close()
+                return
+
+    return run
+
+
 class TravelingSalesman:
-    def __init__(self, nodes):
+    def __init__(self, nodes=None, coords=None, metric=TSPLib.euclidean):
+        # Either Node objects (for the UI) or a bare coordinate array, e.g. from a TSPLIB file
         self.nodes = nodes
+        # Coordinates and pairwise distances are computed once per instance;
+        # every heuristic, tour evaluation and ACO step reads from them.
+        if coords is None:
+            coords = [(node.x, node.y) for node in nodes]
+        self.coords = np.asarray(coords, dtype=float)
+        self.metric = metric
+        # Dense, memory-mapped or on-demand storage depending on the instance size
+        self.dist = TSPDistance.make_distance(self.coords, metric)
+        self.index = TSPSpatialIndex.GridIndex(self.coords)
         self.best_path = self.nearest_neighbor()  # Start with a heuristic
         self.best_distance = self.calculate_total_distance(self.best_path)
+        self.bound = None
+        self.current_gap = None
+        if candidate_source == 'alpha' and self.lower_bound() is not None:
+            self.neighbors = self.lower_bound().alpha_candidates(neighbor_count)
+        elif metric in TSPLib.planar_metrics:
+            self.neighbors = self.index.k_nearest(neighbor_count)
+        else:
+            # Grid neighbors on e.g. GEO's degrees-and-minutes are ordered wrongly for the local search cutoffs
+            self.neighbors = TSPLocalSearch.nearest_neighbors(self.dist, neighbor_count)
+        self.local_search = TSPLocalSearch.LocalSearch(self.dist, self.neighbors, local_search_operators,
+                                                       first_improvement)
 
     def calculate_total_distance(self, path):
-        return sum(math.sqrt((self.nodes[path[i]].x - self.nodes[path[i - 1]].x) ** 2 +
-                             (self.nodes[path[i]].y - self.nodes[path[i - 1]].y) ** 2)
-                   for i in range(len(path)))
+        return self.dist.tour_length(path)
+
+    def lower_bound(self):
+        """Held-Karp bound of the instance, computed on first use; None for instances past bound_city_limit
+        and for fewer than 3 cities, where a 1-tree does not exist."""
+        if self.bound is None and 3 <= len(self.dist) <= bound_city_limit:
+            self.bound = TSPBounds.HeldKarpBound(self.dist, self.best_distance)
+        return self.bound
+
+    def gap(self, distance):
+        bound = self.lower_bound()
+        return None if bound is None else bound.gap(distance)
+
+    def shared_distance(self):
+        """Arrays to place in shared memory and the backend to pickle for worker processes."""
+        if isinstance(self.dist, TSPDistance.DenseDistance):
+            return {'dist': self.dist.matrix}, None
+        # Memory-mapped and on-demand backends pickle as a file name or the coordinates
+        return {}, self.dist
 
     def nearest_neighbor(self):
-        unvisited = set(range(len(self.nodes)))
-        path = [unvisited.pop()]
-
-        while unvisited:
-            last = path[-1]
-            next_city = min(unvisited, key=lambda city: math.sqrt((self.nodes[last].x - self.nodes[city].x) ** 2 +
-                                                                  (self.nodes[last].y - self.nodes[city].y) ** 2))
-            path.append(next_city)
-            unvisited.remove(next_city)
-
-        return path
+        return self.index.nearest_neighbor_tour(0)
 
     def two_opt(self, path):
-        best = path[:]
-        improved = True
-        while improved:
-            improved = False
-            for i in range(1, len(best) - 2):
-                for j in range(i + 1, len(best)):
-                    if j - i == 1: continue
-                    new_path = best[:]
-                    new_path[i:j] = best[j - 1:i - 1:-1]
-                    new_distance = self.calculate_total_distance(new_path)
-                    if new_distance < self.calculate_total_distance(best):
-                        best = new_path
-                        improved = True
-            path = best
-        return path
+        return TSPLocalSearch.two_opt(self.dist, path, self.neighbors)
+
+    def polish(self, path):
+        return self.local_search.optimize(path)
 
+    @stops_at_gap
     def simulated_annealing(self):
-        current_path = self.best_path[:]
-        current_distance = self.best_distance
+        if parallel_tempering:
+            yield from self.parallel_tempering()
+            return
+
+        annealer = Annealer(self.dist, self.neighbors, self.best_path)
         temperature = initial_temp
+        step = 0
 
         while temperature > 1:
-            # Select a new neighboring solution by swapping two cities
-            new_path = current_path[:]
-            i, j = random.sample(range(len(self.nodes)), 2)
-            new_path[i], new_path[j] = new_path[j], new_path[i]
-
-            # Apply a two-opt move to the new path for local optimization
-            new_path = self.two_opt(new_path)
-            new_distance = self.calculate_total_distance(new_path)
-
-            # Decide whether to accept the new solution
-            if (new_distance < current_distance or
-                    math.exp((current_distance - new_distance) / temperature) > random.random()):
-                current_path, current_distance = new_path, new_distance
-                if new_distance < self.best_distance:
-                    self.best_path, self.best_distance = new_path, new_distance
+            annealer.run(temperature, anneal_moves_per_step)
+            if annealer.best_length < self.best_distance:
+                self.best_path, self.best_distance = annealer.best_path, annealer.best_length
 
             # Reduce the temperature slowly for gradual convergence
             temperature *= cooling_rate
-            yield self.best_path, self.best_distance
-
+            step += 1
+            if step % anneal_report_interval == 0:
+                yield self.best_path, self.best_distance
+
+        yield self.finish_annealing()
+
+    def parallel_tempering(self):
+        """Anneal replicas at fixed temperatures in a process pool, swapping neighbors on the ladder."""
+        temperatures = np.geomspace(initial_temp, 1, tempering_replicas)
+        start = np.asarray(self.best_path)
+        rng = np.random.default_rng()
+        shared, dist = self.shared_distance()
+        with shared_arrays(**shared, neighbors=self.neighbors,
+                           tours=np.tile(start, (tempering_replicas, 1)),
+                           lengths=np.full(tempering_replicas, self.best_distance),
+                           best_tours=np.tile(start, (tempering_replicas, 1)),
+                           best_lengths=np.full(tempering_replicas, self.best_distance)) as (arrays, spec):
+            with ProcessPoolExecutor(tempering_workers, initializer=_attach_workers, initargs=(spec, dist)) as pool:
+                seeds = np.random.SeedSequence()
+                for round_number in range(tempering_rounds):
+                    jobs = [pool.submit(_anneal_replica, i, temperatures[i], anneal_moves_per_step, seed)
+                            for i, seed in enumerate(seeds.spawn(tempering_replicas))]
+                    for job in jobs:
+                        job.result()
+
+                    # Replica exchange between neighboring temperatures, alternating even and odd pairs
+                    for i in range(round_number % 2, tempering_replicas - 1, 2):
+                        j = i + 1
+                        exponent = (1 / temperatures[i] - 1 / temperatures[j]) * (
+                                arrays['lengths'][i] - arrays['lengths'][j])
+                        if exponent >= 0 or rng.random() < math.exp(exponent):
+                            arrays['tours'][[i, j]] = arrays['tours'][[j, i]]
+                            arrays['lengths'][[i, j]] = arrays['lengths'][[j, i]]
+
+                    best = int(np.argmin(arrays['best_lengths']))
+                    if arrays['best_lengths'][best] < self.best_distance:
+                        self.best_path = arrays['best_tours'][best].tolist()
+                        self.best_distance = float(arrays['best_lengths'][best])
+                    if (round_number + 1) % anneal_report_interval == 0:
+                        yield self.best_path, self.best_distance
+
+        yield self.finish_annealing()
+
+    def finish_annealing(self):
+        path = self.polish(self.best_path)
+        distance = self.calculate_total_distance(path)
+        if distance < self.best_distance:
+            self.best_path, self.best_distance = path, distance
+        return self.best_path, self.best_distance
+
+    @stops_at_gap
+    def held_karp(self):
+        """Provably optimal tour from the bitmask dynamic program; raises ValueError past exact_memory_budget."""
+        path = held_karp_tour(np.asarray(self.dist, dtype=float))
+        distance = self.calculate_total_distance(path)
+        if distance < self.best_distance:
+            self.best_path, self.best_distance = path, distance
+        yield path, distance
+
+    @stops_at_gap
     def ant_colony_optimization(self):
-        num_nodes = len(self.nodes)
-        pheromones = [[1.0 for _ in range(num_nodes)] for _ in range(num_nodes)]
+        if aco_workers > 1:
+            yield from self.parallel_ant_colony_optimization()
+            return
+
+        colony = AntColony(self.dist, self.neighbors)
         best_path = None
         best_distance = float('inf')
 
         for _ in range(num_iterations):
-            paths = []
-            distances = []
-
-            for _ in range(num_ants):
-                path = self.generate_ant_path(pheromones)
-                distance = self.calculate_total_distance(path)
-                paths.append(path)
-                distances.append(distance)
-
-                if distance < best_distance:
-                    best_distance = distance
-                    best_path = path
-
-            for i in range(num_nodes):
-                for j in range(i + 1, num_nodes):
-                    pheromones[i][j] *= (1 - pheromone_evaporation_rate)
-                    pheromones[j][i] = pheromones[i][j]
-
-            for k, path in enumerate(paths):
-                distance = distances[k]
-                for i in range(len(path)):
-                    a, b = path[i - 1], path[i]
-                    pheromones[a][b] += pheromone_constant / distance
-                    pheromones[b][a] = pheromones[a][b]
-
-            yield best_path, best_distance
-
-    def generate_ant_path(self, pheromones):
-        path = [random.randint(0, len(self.nodes) - 1)]
-        unvisited = set(range(len(self.nodes))) - {path[0]}
+            tours, distances = colony.construct_tours(num_ants)
+            k = int(np.argmin(distances))
 
-        while unvisited:
-            current = path[-1]
-            next_city = self.select_next_city(current, unvisited, pheromones)
-            path.append(next_city)
-            unvisited.remove(next_city)
+            if aco_local_search:
+                # Polish the iteration-best ant so it also deposits the improved tour
+                tours[k] = self.polish(tours[k])
+                distances[k] = self.calculate_total_distance(tours[k])
 
-        return path
+            if distances[k] < best_distance:
+                best_distance = float(distances[k])
+                best_path = tours[k].tolist()
 
-    def select_next_city(self, current, unvisited, pheromones):
-        probabilities = []
-        for city in unvisited:
-            edge_pheromone = pheromones[current][city]
-            edge_distance = math.sqrt((self.nodes[current].x - self.nodes[city].x) ** 2 +
-                                      (self.nodes[current].y - self.nodes[city].y) ** 2)
-            probabilities.append((edge_pheromone ** alpha) * ((1 / edge_distance) ** beta))
-
-        total = sum(probabilities)
-        probabilities = [p / total for p in probabilities]
+            colony.update(tours, distances)
+            yield best_path, best_distance
 
-        return random.choices(list(unvisited), weights=probabilities, k=1)[0]
+    def parallel_ant_colony_optimization(self):
+        """Run aco_workers colonies in a process pool, exchanging pheromones and the global best tour
+        through shared memory."""
+        n = len(self.dist)
+        shared, dist = self.shared_distance()
+        with shared_arrays(**shared, neighbors=self.neighbors,
+                           pheromones=np.ones((aco_workers, n, n)),
+                           best_tours=np.zeros((aco_workers, n), dtype=np.int64),
+                           best_distances=np.full(aco_workers, np.inf)) as (arrays, spec):
+            with ProcessPoolExecutor(aco_workers, initializer=_attach_workers, initargs=(spec, dist)) as pool:
+                seeds = np.random.SeedSequence()
+                for start in range(0, num_iterations, aco_sync_interval):
+                    iterations = min(aco_sync_interval, num_iterations - start)
+                    jobs = [pool.submit(_run_colony, i, iterations, seed)
+                            for i, seed in enumerate(seeds.spawn(aco_workers))]
+                    for job in jobs:
+                        job.result()
+
+                    # Exchange pheromones in place; only indices and counts cross the process boundary
+                    if aco_exchange == 'ring':
+                        arrays['pheromones'][:] = (arrays['pheromones'] + np.roll(arrays['pheromones'], 1, axis=0)) / 2
+                    else:
+                        arrays['pheromones'][:] = arrays['pheromones'].mean(axis=0)
+
+                    # Every colony is pulled toward the global best tour, as if one of its own ants had found it
+                    best = int(np.argmin(arrays['best_distances']))
+                    tour, distance = arrays['best_tours'][best], float(arrays['best_distances'][best])
+                    if np.isfinite(distance):
+                        a, b = tour, np.roll(tour, 1)
+                        arrays['pheromones'][:, a, b] += pheromone_constant / distance
+                        arrays['pheromones'][:, b, a] += pheromone_constant / distance
+                    yield tour.tolist(), distance
+
+
+def held_karp_memory(n):
+    """Bytes used by the Held-Karp tables for n cities."""
+    m = max(n - 1, 0)
+    # float64 costs and int8 predecessors per (subset, last city), plus per-subset popcounts and layer order
+    tables = 2 ** m * m * 9 + 2 ** m * 9
+    # The widest layer's gathered costs and their argmin
+    return tables + math.comb(m, m // 2) * m * 16
+
+
+def held_karp_tour(dist):
+    """Exact tour by dynamic programming over subsets, filled one subset size at a time.
+
+    cost[mask, j] is the shortest path that starts at city 0, visits exactly the cities in mask
+    (bit b stands for city b + 1) and ends at city j + 1.
+    """
+    n = len(dist)
+    if n <= 3:
+        return list(range(n))
+    if held_karp_memory(n) > exact_memory_budget:
+        raise ValueError(f"Held-Karp on {n} cities needs {held_karp_memory(n) / 1024 ** 2:.0f} MB, "
+                         f"more than exact_memory_budget allows")
+
+    m = n - 1
+    inner = dist[1:, 1:]
+    masks = np.arange(2 ** m)
+    popcount = np.zeros(2 ** m, dtype=np.uint8)
+    for b in range(m):
+        popcount += ((masks >> b) & 1).astype(np.uint8)
+    del masks
+    by_size = np.argsort(popcount, kind='stable')
+    layer_start = np.concatenate(([0], np.cumsum(np.bincount(popcount, minlength=m + 1))))
+    del popcount
+
+    cost = np.full((2 ** m, m), np.inf)
+    previous = np.zeros((2 ** m, m), dtype=np.int8)
+    cost[1 << np.arange(m), np.arange(m)] = dist[0, 1:]
+
+    for size in range(2, m + 1):
+        layer = by_size[layer_start[size]:layer_start[size + 1]]
+        for j in range(m):
+            subsets = layer[(layer >> j) & 1 == 1]
+            # Paths over the subset without j, extended by the edge to j; cities outside stay inf
+            extended = cost[subsets ^ (1 << j)] + inner[:, j]
+            best = np.argmin(extended, axis=1)
+            cost[subsets, j] = extended[np.arange(len(subsets)), best]
+            previous[subsets, j] = best
+
+    mask = 2 ** m - 1
+    j = int(np.argmin(cost[mask] + dist[1:, 0]))
+    path = []
+    while mask:
+        path.append(j + 1)
+        mask, j = mask ^ (1 << j), int(previous[mask, j])
+    return [0] + path[::-1]
+
+
+@contextmanager
+def shared_arrays(**arrays):
+    """Copy arrays into SharedMemory blocks; yields views onto them and a spec for _attach_workers.
+
+    Callers must not keep their own references to the views, or the blocks cannot be closed on exit.
+    """
+    blocks, views = {}, {}
+    try:
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            blocks[name] = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            views[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=blocks[name].buf)
+            views[name][...] = array
+        spec = {name: (blocks[name].name, view.shape, view.dtype) for name, view in views.items()}
+        yield views, spec
+    finally:
+        views.clear()
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+
+# Shared-memory views, local search and colonies of a worker process, set up once by _attach_workers
+_worker = {}
+
+
+def _attach_workers(spec, dist=None):
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker[name + '_block'] = block
+        _worker[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    if dist is not None:
+        _worker['dist'] = dist
+    _worker['local_search'] = TSPLocalSearch.LocalSearch(_worker['dist'], _worker['neighbors'], local_search_operators,
+                                                         first_improvement)
+    _worker['colonies'] = {}
+
+
+def _run_colony(index, iterations, seed):
+    colonies = _worker['colonies']
+    if index not in colonies:
+        colonies[index] = AntColony(_worker['dist'], _worker['neighbors'], pheromones=_worker['pheromones'][index])
+    colony = colonies[index]
+    colony.rng = np.random.default_rng(seed)
+    best_tours, best_distances = _worker['best_tours'], _worker['best_distances']
+
+    for _ in range(iterations):
+        tours, distances = colony.construct_tours(num_ants)
+        k = int(np.argmin(distances))
+        if aco_local_search:
+            tours[k] = _worker['local_search'].optimize(tours[k])
+            distances[k] = colony.dist[tours[k], np.roll(tours[k], 1)].sum(dtype=np.float64)
+        if distances[k] < best_distances[index]:
+            best_distances[index] = distances[k]
+            best_tours[index] = tours[k]
+        colony.update(tours, distances)
+
+    return iterations * num_ants
+
+
+def _anneal_replica(index, temperature, moves, seed):
+    annealer = Annealer(_worker['dist'], _worker['neighbors'], _worker['tours'][index], np.random.default_rng(seed))
+    annealer.run(temperature, moves)
+    _worker['tours'][index] = annealer.tour.order
+    _worker['lengths'][index] = annealer.length
+    if annealer.best_length < _worker['best_lengths'][index]:
+        _worker['best_tours'][index] = annealer.best_path
+        _worker['best_lengths'][index] = annealer.best_length
+    return annealer.length
+
+
+class AntColony:
+    """Pheromone matrix, eta**beta heuristic matrix and batched tour construction for a whole colony."""
+
+    def __init__(self, dist, neighbors, pheromones=None, rng=None):
+        self.dist = dist
+        self.n = len(dist)
+        self.neighbors = np.asarray(neighbors)
+        with np.errstate(divide='ignore'):
+            self.eta_beta = (1 / np.asarray(dist, dtype=float)) ** beta
+        self.eta_beta[~np.isfinite(self.eta_beta)] = 0
+        self.pheromones = np.ones((self.n, self.n)) if pheromones is None else pheromones
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    def construct_tours(self, num_ants):
+        """Advance all ants together; returns a (num_ants, n) tour array and the tour lengths."""
+        n, rng = self.n, self.rng
+        weights = self.pheromones ** alpha * self.eta_beta
+        ants = np.arange(num_ants)
+        tours = np.empty((num_ants, n), dtype=np.int64)
+        visited = np.zeros((num_ants, n), dtype=bool)
+        current = rng.integers(n, size=num_ants)
+        tours[:, 0] = current
+        visited[ants, current] = True
+
+        for step in range(1, n):
+            # Roulette over each ant's unvisited candidates
+            candidates = self.neighbors[current]
+            candidate_weights = weights[current[:, None], candidates]
+            candidate_weights[visited[ants[:, None], candidates]] = 0
+            next_city = self.roulette(candidates, candidate_weights)
+
+            # Ants whose candidate list is used up sample over every unvisited city
+            stuck = np.flatnonzero(next_city < 0)
+            if len(stuck):
+                row_weights = np.where(visited[stuck], 0, weights[current[stuck]])
+                row_weights[(row_weights.sum(axis=1) == 0)[:, None] & ~visited[stuck]] = 1
+                cities = np.broadcast_to(np.arange(n), row_weights.shape)
+                next_city[stuck] = self.roulette(cities, row_weights)
+
+            current = next_city
+            tours[:, step] = current
+            visited[ants, current] = True
+
+        distances = self.dist[tours, np.roll(tours, 1, axis=1)].sum(axis=1, dtype=np.float64)
+        return tours, distances
+
+    def roulette(self, choices, weights):
+        """Sample one entry of every row of choices in proportion to weights; -1 where a row has no weight."""
+        cumulative = np.cumsum(weights, axis=1)
+        totals = cumulative[:, -1]
+        threshold = self.rng.random(len(weights)) * totals
+        picks = np.minimum((cumulative <= threshold[:, None]).sum(axis=1), weights.shape[1] - 1)
+        return np.where(totals > 0, choices[np.arange(len(weights)), picks], -1)
+
+    def update(self, tours, distances):
+        """Evaporate every edge, then let each ant deposit pheromone_constant / length on its tour."""
+        self.pheromones *= (1 - pheromone_evaporation_rate)
+        a, b = tours, np.roll(tours, 1, axis=1)
+        deposit = np.broadcast_to((pheromone_constant / distances)[:, None], a.shape)
+        np.add.at(self.pheromones, (a, b), deposit)
+        np.add.at(self.pheromones, (b, a), deposit)
+
+
+class Annealer:
+    """Annealing chain that proposes random 2-opt / or-opt moves, scores them by delta and applies them in place."""
+
+    def __init__(self, dist, neighbors, path, rng=None):
+        self.dist = dist
+        self.neighbors = np.asarray(neighbors).tolist()
+        self.tour = TSPLocalSearch.Tour(path)
+        self.length = self.tour_length()
+        self.best_path = self.tour.path()
+        self.best_length = self.length
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    def tour_length(self):
+        order = np.asarray(self.tour.order)
+        return float(self.dist[order, np.roll(order, 1)].sum(dtype=np.float64))
+
+    def run(self, temperature, moves):
+        """Propose the given number of moves at a fixed temperature."""
+        tour, dist, neighbors, n = self.tour, self.dist, self.neighbors, self.tour.n
+        if n < 8:
+            return
+        rng = self.rng
+        cities = rng.integers(n, size=moves).tolist()
+        picks = rng.integers(len(neighbors[0]), size=moves).tolist()
+        # Bit 0 picks the direction, bit 1 the side of c to insert at, the rest 2-opt (0) or or-opt length
+        kinds = rng.integers(16, size=moves).tolist()
+        # Accepting when delta < -T ln(u) is the Metropolis test without an exp per move
+        thresholds = (-temperature * np.log(1 - rng.random(moves))).tolist()
+        length, best_length = self.length, self.best_length
+        unsaved_best = False
+
+        for a, pick, kind, threshold in zip(cities, picks, kinds, thresholds):
+            c = neighbors[a][pick]
+            succ, pred = (tour.next, tour.prev) if kind & 1 else (tour.prev, tour.next)
+            segment_length = kind >> 2
+            if segment_length == 0:
+                b, d = succ(a), succ(c)
+                if c == b or d == a:
+                    continue
+                delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+                steps = ((a, b, c, d),)
+            else:
+                segment = [a]
+                for _ in range(segment_length - 1):
+                    segment.append(succ(segment[-1]))
+                s1, s2 = a, segment[-1]
+                p, nx = pred(s1), succ(s2)
+                d = succ(c) if kind & 2 else pred(c)
+                if c in segment or d in segment or p in segment:
+                    continue
+                delta = (dist[p, nx] + dist[c, s1] + dist[s2, d]
+                         - dist[p, s1] - dist[s2, nx] - dist[c, d])
+                if kind & 2:
+                    steps = ((p, s1, c, d), (p, c, nx, s2), (c, s2, s1, d))
+                else:
+                    steps = ((p, s1, d, c), (p, d, nx, s2))
+
+            if delta < threshold:
+                # The chain is about to climb out of its best tour so far, so keep a copy of it
+                if delta > 0 and unsaved_best:
+                    length = self.save_best()
+                    unsaved_best = False
+                tour.apply(steps)
+                length += delta
+                if length < best_length - TSPLocalSearch.improvement_epsilon:
+                    best_length = length
+                    unsaved_best = True
+
+        if unsaved_best:
+            self.save_best()
+        self.length = self.tour_length()
+
+    def save_best(self):
+        self.best_path = self.tour.path()
+        self.best_length = self.tour_length()
+        return self.best_length
 
 
 class UI(tk.Tk):
@@ -179,7 +560,7 @@ class UI(tk.Tk):
         solver_label = tk.Label(self, text="Select Solver:")
         solver_label.pack()
         solver_menu = ttk.Combobox(self, textvariable=self.solver_var,
-                                   values=["Simulated Annealing", "Ant Colony Optimization"])
+                                   values=list(self.solvers()))
         solver_menu.pack()
 
         # Start button
@@ -203,18 +584,48 @@ class UI(tk.Tk):
             edge_id = self.canvas.create_line(a.x, a.y, b.x, b.y, fill="blue", width=road_width)
             self.current_edges.append(edge_id)
 
-        self.canvas.itemconfig(self.distance_text, text=f"Distance: {distance:.2f}")
+        gap = self.tsp_solver.current_gap
+        gap_text = f"  Gap: {100 * gap:.2f}%" if gap is not None else ""
+        self.canvas.itemconfig(self.distance_text, text=f"Distance: {distance:.2f}{gap_text}")
         self.canvas.update()
 
     def start_solver(self):
         solver_choice = self.solver_var.get()
-        solver_func = self.tsp_solver.simulated_annealing if solver_choice == "Simulated Annealing" else self.tsp_solver.ant_colony_optimization
-        for path, distance in solver_func():
-            self.draw_edges(path, distance)
+        solver_func = self.solvers()[solver_choice]
+        try:
+            for path, distance in solver_func():
+                self.draw_edges(path, distance)
+        except ValueError as error:
+            self.canvas.itemconfig(self.distance_text, text=str(error))
+
+    def solvers(self):
+        return {
+            "Simulated Annealing": self.tsp_solver.simulated_annealing,
+            "Ant Colony Optimization": self.tsp_solver.ant_colony_optimization,
+            "Exact (Held-Karp)": self.tsp_solver.held_karp,
+        }
+
+
+def solve_tsplib(tsp_path, tour_path=None):
+    """Solve a TSPLIB instance without the UI, reporting the gap to the optimal tour if one is given."""
+    instance = TSPLib.load_tsp(tsp_path)
+    tsp_solver = TravelingSalesman(coords=instance.coords, metric=instance.metric)
+    optimum = tsp_solver.calculate_total_distance(TSPLib.load_tour(tour_path)) if tour_path else None
+    print(f"{instance.name}: {instance.dimension} cities, {instance.edge_weight_type}")
+
+    for path, distance in tsp_solver.simulated_annealing():
+        gap = f"  Gap: {100 * (distance - optimum) / optimum:.2f}%" if optimum else ""
+        if tsp_solver.current_gap is not None:
+            gap += f"  Bound gap: {100 * tsp_solver.current_gap:.2f}%"
+        print(f"Distance: {distance:.0f}{gap}")
 
 
 if __name__ == "__main__":
-    nodes = [Node(random.randint(padding, 700), random.randint(padding, 500)) for _ in range(num_cities)]
-    tsp_solver = TravelingSalesman(nodes)
-    ui = UI(tsp_solver)
-    ui.mainloop()
+    if len(sys.argv) > 1:
+        # python TravelingSalesman.py instance.tsp [instance.opt.tour]
+        solve_tsplib(*sys.argv[1:3])
+    else:
+        nodes = [Node(random.randint(padding, 700), random.randint(padding, 500)) for _ in range(num_cities)]
+        tsp_solver = TravelingSalesman(nodes)
+        ui = UI(tsp_solver)
+        ui.mainloop()
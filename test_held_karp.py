@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import TravelingSalesman
+
+
+def brute_force_length(dist):
+    """Shortest tour length by enumerating every tour that starts at city 0."""
+    n = len(dist)
+    best = np.inf
+    for rest in itertools.permutations(range(1, n)):
+        path = (0,) + rest
+        best = min(best, sum(dist[path[i - 1], path[i]] for i in range(n)))
+    return best
+
+
+def tour_length(dist, path):
+    return sum(dist[path[i - 1], path[i]] for i in range(len(path)))
+
+
+@pytest.mark.parametrize('n', range(1, 10))
+def test_held_karp_matches_brute_force(n):
+    rng = np.random.default_rng(n)
+    coords = rng.random((n, 2)) * 100
+    dist = np.sqrt(((coords[:, None] - coords[None]) ** 2).sum(axis=2))
+
+    path = TravelingSalesman.held_karp_tour(dist)
+
+    assert sorted(path) == list(range(n))
+    assert tour_length(dist, path) == pytest.approx(brute_force_length(dist))
+
+
+@pytest.mark.parametrize('solver', ['simulated_annealing', 'ant_colony_optimization'])
+def test_heuristics_never_beat_held_karp(solver, monkeypatch):
+    monkeypatch.setattr(TravelingSalesman, 'cooling_rate', 0.9)
+    monkeypatch.setattr(TravelingSalesman, 'anneal_moves_per_step', 100)
+    monkeypatch.setattr(TravelingSalesman, 'num_iterations', 10)
+    rng = np.random.default_rng(0)
+    tsp_solver = TravelingSalesman.TravelingSalesman(coords=rng.random((9, 2)) * 500)
+    optimum = tsp_solver.calculate_total_distance(TravelingSalesman.held_karp_tour(np.asarray(tsp_solver.dist)))
+
+    for path, distance in getattr(tsp_solver, solver)():
+        assert sorted(path) == list(range(9))
+        assert distance == pytest.approx(tsp_solver.calculate_total_distance(path))
+        assert distance >= optimum - 1e-9
+
+
+@pytest.mark.parametrize('n', [1, 2])
+def test_tiny_instances_report_no_gap(n):
+    tsp_solver = TravelingSalesman.TravelingSalesman(coords=[[float(i), 2.0 * i] for i in range(n)])
+
+    (path, distance), = tsp_solver.held_karp()
+
+    assert sorted(path) == list(range(n))
+    assert tsp_solver.current_gap is None